@@ -30,9 +30,14 @@ import math
 import random
 import shutil
 import zipfile
-import glob
-import requests
+import fnmatch
 import io
+import types
+import array
+import bisect
+import functools
+import zlib
+from dataclasses import dataclass
 
 # -------------------------
 # CONFIGURATION
@@ -58,6 +63,10 @@ TREE_SCATTER_OUTER  = 60.0  # Trees spread much further from path for forest cov
 OBJECTS_PER_SEGMENT = 6  # Reduced for faster loading
 SEED                = 42
 
+# Shared generator for all placement randomness (reseeded in main).
+# Kept separate from the global random module so imports cannot disturb it.
+RNG = random.Random(SEED)
+
 # Environment settings
 GROUND_SIZE = 500.0
 GROUND_COLOR = (0.3, 0.45, 0.2)  # Grass green RGB
@@ -73,7 +82,7 @@ SUN_ROTATION_Y = -30.0  # Degrees
 GRAPHICS_QUALITY = "medium"  # Changed from ultra - SDFGI can cause black screen on some GPUs
 
 # Ultra quality settings (requires good GPU)
-GRAPHICS_ULTRA = {
+GRAPHICS_ULTRA = types.MappingProxyType({
     # Global Illumination - SDFGI (Signed Distance Field GI)
     "sdfgi_enabled": True,
     "sdfgi_cascades": 6,              # More cascades = larger area coverage
@@ -137,7 +146,7 @@ GRAPHICS_ULTRA = {
     "glow_hdr_scale": 2.0,
     "glow_hdr_luminance_cap": 12.0,
     "glow_map_strength": 0.8,
-    "glow_levels": [1, 0, 1, 0, 1, 0, 0],  # Which mip levels contribute
+    "glow_levels": (1, 0, 1, 0, 1, 0, 0),  # Which mip levels contribute
 
     # Tonemapping
     "tonemap_mode": 3,                # ACES Filmic (best for realistic look)
@@ -172,10 +181,10 @@ GRAPHICS_ULTRA = {
     "dof_blur_far_distance": 100.0,
     "dof_blur_far_transition": 50.0,
     "dof_blur_near_enabled": False,
-}
+})
 
 # High quality settings (balanced)
-GRAPHICS_HIGH = {
+GRAPHICS_HIGH = types.MappingProxyType({
     "sdfgi_enabled": True,
     "sdfgi_cascades": 4,
     "sdfgi_min_cell_size": 0.4,
@@ -229,7 +238,7 @@ GRAPHICS_HIGH = {
     "glow_hdr_scale": 2.0,
     "glow_hdr_luminance_cap": 12.0,
     "glow_map_strength": 0.8,
-    "glow_levels": [1, 0, 1, 0, 1, 0, 0],
+    "glow_levels": (1, 0, 1, 0, 1, 0, 0),
 
     "tonemap_mode": 3,
     "tonemap_exposure": 1.0,
@@ -251,10 +260,10 @@ GRAPHICS_HIGH = {
 
     "dof_blur_far_enabled": False,
     "dof_blur_near_enabled": False,
-}
+})
 
 # Medium quality settings (good performance)
-GRAPHICS_MEDIUM = {
+GRAPHICS_MEDIUM = types.MappingProxyType({
     "sdfgi_enabled": False,
 
     "ssr_enabled": False,
@@ -283,7 +292,7 @@ GRAPHICS_MEDIUM = {
     "glow_hdr_threshold": 1.0,
     "glow_hdr_scale": 2.0,
     "glow_hdr_luminance_cap": 12.0,
-    "glow_levels": [1, 0, 1, 0, 0, 0, 0],
+    "glow_levels": (1, 0, 1, 0, 0, 0, 0),
 
     "tonemap_mode": 2,  # Reinhard
     "tonemap_exposure": 1.0,
@@ -300,10 +309,10 @@ GRAPHICS_MEDIUM = {
 
     "dof_blur_far_enabled": False,
     "dof_blur_near_enabled": False,
-}
+})
 
 # Low quality settings (maximum performance)
-GRAPHICS_LOW = {
+GRAPHICS_LOW = types.MappingProxyType({
     "sdfgi_enabled": False,
     "ssr_enabled": False,
     "ssao_enabled": False,
@@ -321,44 +330,264 @@ GRAPHICS_LOW = {
     "directional_shadow_max_distance": 50.0,
     "dof_blur_far_enabled": False,
     "dof_blur_near_enabled": False,
-}
+})
+
+# Quality name -> preset, built once instead of on every lookup
+GRAPHICS_PRESETS = types.MappingProxyType({
+    "ultra": GRAPHICS_ULTRA,
+    "high": GRAPHICS_HIGH,
+    "medium": GRAPHICS_MEDIUM,
+    "low": GRAPHICS_LOW,
+})
+
+# Fallbacks for the graphics keys a quality preset may omit, used by the
+# environment block
+GRAPHICS_DEFAULTS = types.MappingProxyType({
+    "tonemap_mode": 3,
+    "tonemap_exposure": 1.0,
+    "tonemap_white": 1.0,
+    "sdfgi_enabled": False,
+    "sdfgi_cascades": 6,
+    "sdfgi_min_cell_size": 0.2,
+    "sdfgi_cascade0_distance": 12.8,
+    "sdfgi_y_scale": 1.0,
+    "sdfgi_energy": 1.0,
+    "sdfgi_normal_bias": 1.1,
+    "sdfgi_probe_bias": 1.1,
+    "sdfgi_bounce_feedback": 0.5,
+    "sdfgi_read_sky_light": True,
+    "ssr_enabled": False,
+    "ssr_max_steps": 64,
+    "ssr_fade_in": 0.15,
+    "ssr_fade_out": 2.0,
+    "ssr_depth_tolerance": 0.2,
+    "ssao_enabled": False,
+    "ssao_radius": 1.0,
+    "ssao_intensity": 2.0,
+    "ssao_power": 1.5,
+    "ssao_detail": 0.5,
+    "ssao_horizon": 0.06,
+    "ssao_sharpness": 0.98,
+    "ssao_light_affect": 0.0,
+    "ssao_ao_channel_affect": 0.0,
+    "ssil_enabled": False,
+    "ssil_radius": 5.0,
+    "ssil_intensity": 1.0,
+    "ssil_sharpness": 0.98,
+    "ssil_normal_rejection": 1.0,
+    "volumetric_fog_enabled": False,
+    "volumetric_fog_albedo": (0.9, 0.92, 0.95),
+    "volumetric_fog_emission": (0.0, 0.0, 0.0),
+    "volumetric_fog_density": 0.01,
+    "volumetric_fog_emission_energy": 0.0,
+    "volumetric_fog_gi_inject": 1.0,
+    "volumetric_fog_anisotropy": 0.2,
+    "volumetric_fog_length": 200.0,
+    "volumetric_fog_detail_spread": 2.0,
+    "volumetric_fog_ambient_inject": 0.0,
+    "volumetric_fog_sky_affect": 1.0,
+    "volumetric_fog_temporal_reprojection_enabled": True,
+    "volumetric_fog_temporal_reprojection_amount": 0.9,
+    "glow_enabled": False,
+    "glow_normalized": False,
+    "glow_intensity": 0.8,
+    "glow_strength": 1.0,
+    "glow_bloom": 0.0,
+    "glow_blend_mode": 2,
+    "glow_hdr_threshold": 1.0,
+    "glow_hdr_scale": 2.0,
+    "glow_hdr_luminance_cap": 12.0,
+    "glow_map_strength": 0.8,
+    "glow_levels": (1, 0, 1, 0, 1, 0, 0),
+    "adjustment_enabled": False,
+    "adjustment_brightness": 1.0,
+    "adjustment_contrast": 1.05,
+    "adjustment_saturation": 1.1,
+    "dof_blur_far_enabled": False,
+    "dof_blur_far_distance": 100.0,
+    "dof_blur_far_transition": 50.0,
+    "dof_blur_near_enabled": False,
+    "dof_blur_near_distance": 2.0,
+    "dof_blur_near_transition": 1.0,
+})
 
 def get_graphics_settings():
     """Get the active graphics quality settings."""
-    quality_map = {
-        "ultra": GRAPHICS_ULTRA,
-        "high": GRAPHICS_HIGH,
-        "medium": GRAPHICS_MEDIUM,
-        "low": GRAPHICS_LOW,
-    }
-    return quality_map.get(GRAPHICS_QUALITY.lower(), GRAPHICS_ULTRA)
+    return GRAPHICS_PRESETS.get(GRAPHICS_QUALITY.lower(), GRAPHICS_ULTRA)
 
 HIGH_QUALITY_ASSET_URLS = {
     "hq_nature": "https://cdn.discordapp.com/attachments/1224863372224565269/1247413941584330752/nature_assets_v1.zip?ex=665fd368&is=665e81e8&hm=b5a93946394337255598d24660b86a3479577558661763c896587c699908d1f7&"
 }
 
+# Chunk size used when streaming downloads and zip members to disk
+ZIP_COPY_BUFFER = 1024 * 1024
+
+# Seconds to wait for the asset server to connect or send more data
+DOWNLOAD_TIMEOUT = 60
+
+def _copy_zip_member(z, member, dest_path, buf=None):
+    """Stream one zip member (name or ZipInfo) to dest_path in ZIP_COPY_BUFFER chunks.
+
+    When buf (a preallocated bytearray) is given it is reused for the copy
+    instead of allocating a fresh chunk per read.
+    """
+    with z.open(member) as src, open(dest_path, "wb") as dst:
+        if buf is None:
+            shutil.copyfileobj(src, dst, ZIP_COPY_BUFFER)
+        else:
+            view = memoryview(buf)
+            n = src.readinto(view)
+            while n:
+                dst.write(view[:n])
+                n = src.readinto(view)
+    return dest_path
+
+def _extract_zip_member(z, info, dest_folder, buf=None):
+    """Extract a single zip member below dest_folder; returns the written path or None."""
+    dest_root = os.path.realpath(dest_folder)
+    target = os.path.realpath(os.path.join(dest_root, info.filename))
+    if target != dest_root and not target.startswith(dest_root + os.sep):
+        return None  # Refuse entries that would escape the destination
+    if info.is_dir():
+        os.makedirs(target, exist_ok=True)
+        return None
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if buf is None:
+        with z.open(info) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst, min(info.file_size, ZIP_COPY_BUFFER) or ZIP_COPY_BUFFER)
+        return target
+    return _copy_zip_member(z, info, target, buf)
+
+def _map_zip_parallel(zip_path, func, items, max_workers=None):
+    """Run func(zip_handle, item, buf) for every item on a thread pool; returns the results.
+
+    ZipFile objects are not safe to share between threads, so each worker
+    opens its own handle (and copy buffer) on first use. zlib releases the
+    GIL while inflating, so members decompress concurrently.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def run_one(item):
+        z = getattr(local, "zip", None)
+        if z is None:
+            z = local.zip = zipfile.ZipFile(zip_path)
+            local.buf = bytearray(ZIP_COPY_BUFFER)
+            with handles_lock:
+                handles.append(z)
+        return func(z, item, local.buf)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            return list(pool.map(run_one, items))
+    finally:
+        for z in handles:
+            z.close()
+
+def extract_zip_parallel(zip_path, dest_folder, max_workers=None):
+    """Extract every member of zip_path using a thread pool; returns the number of files written."""
+    with zipfile.ZipFile(zip_path) as z:
+        infos = z.infolist()
+    results = _map_zip_parallel(
+        zip_path, lambda z, info, buf: _extract_zip_member(z, info, dest_folder, buf),
+        infos, max_workers)
+    return sum(1 for path in results if path)
+
+# Extraction stamps live in <dest dir>/.cache, one "<name>.crc" per extracted file
+EXTRACT_CACHE_DIR = ".cache"
+
+def _extract_stamp_path(dest_path):
+    """Sidecar recording which zip member dest_path was extracted from."""
+    folder, name = os.path.split(dest_path)
+    return os.path.join(folder, EXTRACT_CACHE_DIR, name + ".crc")
+
+def _extract_stamp(info):
+    """Stamp text for a ZipInfo: CRC-32, size and member name, all from the central directory."""
+    return f"{info.CRC:08x} {info.file_size} {info.filename}\n"
+
+def is_extracted(zf, member, dest_path):
+    """
+    True if dest_path already holds this zip member (name or ZipInfo).
+    Both the file's size and the (CRC, size, name) stamp written after its
+    extraction must match the zip's central directory, so truncated files
+    and re-exported assets of the same size are extracted again.
+    """
+    info = member if isinstance(member, zipfile.ZipInfo) else zf.getinfo(member)
+    try:
+        if os.stat(dest_path).st_size != info.file_size:
+            return False
+        with open(_extract_stamp_path(dest_path), encoding="utf-8") as f:
+            return f.read() == _extract_stamp(info)
+    except OSError:
+        return False
+
+def _extract_member(z, member, dest_path, buf=None):
+    """Copy one zip member to dest_path, then record its extraction stamp."""
+    _copy_zip_member(z, member, dest_path, buf)
+    info = member if isinstance(member, zipfile.ZipInfo) else z.getinfo(member)
+    stamp_path = _extract_stamp_path(dest_path)
+    os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        f.write(_extract_stamp(info))
+    return dest_path
+
+def extract_zip_members(zf, jobs, max_workers=None):
+    """
+    Copy (member, dest_path) pairs out of the open zip, in parallel when it
+    was opened by path, stamping each file for is_extracted.
+    """
+    if not jobs:
+        return
+    if zf.filename is None or len(jobs) == 1:
+        for member, dest_path in jobs:
+            _extract_member(zf, member, dest_path)
+        return
+    _map_zip_parallel(zf.filename, lambda z, job, buf: _extract_member(z, job[0], job[1], buf),
+                      jobs, max_workers)
+
 def download_and_extract_assets(url, dest_folder):
-    """Download and extract a zip file from a URL."""
+    """Download and extract a zip file from a URL.
+
+    The archive is streamed to a temporary file and unpacked member by member,
+    so peak memory stays around one copy buffer instead of the whole zip.
+    """
+    # Only needed for the optional download, so keep them off the startup path
+    import tempfile
+    import urllib.request
+
     print(f"Downloading assets from {url}...")
+    tmp_path = None
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-            z.extractall(dest_folder)
-        print(f"Assets extracted to {dest_folder}")
+        # Raises HTTPError on bad status codes, and times out on a stalled server
+        with urllib.request.urlopen(url, timeout=DOWNLOAD_TIMEOUT) as response:
+            with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+                tmp_path = tmp.name
+                shutil.copyfileobj(response, tmp, ZIP_COPY_BUFFER)
+        count = extract_zip_parallel(tmp_path, dest_folder)
+        print(f"Assets extracted to {dest_folder} ({count} files)")
         return True
-    except requests.exceptions.RequestException as e:
-        print(f"Error downloading assets: {e}")
-        return False
     except zipfile.BadZipFile:
         print("Error: Downloaded file is not a valid zip file.")
         return False
+    except OSError as e:
+        # URLError/HTTPError, timeouts, connection resets and disk errors
+        # from the temporary file or the extraction
+        print(f"Error downloading assets: {e}")
+        return False
+    finally:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 # Placement settings - ENHANCED with Poisson Disc Sampling
 MIN_OBJECT_SPACING = 1.0    # Global minimum distance between objects
 CLEARING_CHANCE = 0.15      # Probability of clearing per path segment
 CLEARING_RADIUS = 8.0       # Radius of clearings where no objects spawn
 CLUSTER_CHANCE = 0.3        # Chance to add satellite objects near placement
+USE_FAST_TRIG = False       # True: object and grass rotations use a 4096-step sin/cos table (0.09 deg steps, lossy)
 
 # Poisson Disc Sampling settings (from C# Infinite Runner)
 USE_POISSON_SAMPLING = True      # Enable Poisson disc sampling for object placement
@@ -381,6 +610,7 @@ TERRAIN_OCTAVES = 4           # Noise detail layers (increased from 3)
 TERRAIN_FREQUENCY = 0.6       # Base noise frequency (from C# project)
 TERRAIN_CONTRAST = 1.2        # Terrain contrast multiplier
 PATH_FLATTEN_RADIUS = 3.0     # Flatten terrain near paths
+HEIGHTMAP_CELL_SIZE = 2.0     # Spacing of the precomputed heightmap grid (world units)
 
 # Multi-pass terrain blending (from C# MapGenerator)
 TERRAIN_PASSES = [
@@ -394,124 +624,66 @@ TERRAIN_PASSES = [
 # Mapped to logical roles used by the placer.
 # -------------------------
 
-KAYKIT_ASSET_ROLES = {
+KAYKIT_ASSET_ROLES = types.MappingProxyType({
     # KayKit assets disabled - using HQ trees instead
-}
-
-KAYKIT_ASSET_ROLES_DISABLED = {
-    # role -> list of possible filenames (first match found will be used)
-    # Supports GLB, FBX, and OBJ formats
+})
 
+# KayKit files follow "<Base>_<Variant>_Color1.fbx". Each row is
+# (role prefix, file base, variant letters); role numbers continue across
+# rows sharing a prefix (tree_bare_1..3 from Tree_Bare_1, 4..6 from Tree_Bare_2).
+KAYKIT_ROLE_SCHEMA = (
     # === TREES (many variants for variety) ===
-    "tree_pine_1":  ["Tree_1_A_Color1.fbx"],
-    "tree_pine_2":  ["Tree_1_B_Color1.fbx"],
-    "tree_pine_3":  ["Tree_1_C_Color1.fbx"],
-    "tree_tall_1":  ["Tree_2_A_Color1.fbx"],
-    "tree_tall_2":  ["Tree_2_B_Color1.fbx"],
-    "tree_tall_3":  ["Tree_2_C_Color1.fbx"],
-    "tree_tall_4":  ["Tree_2_D_Color1.fbx"],
-    "tree_tall_5":  ["Tree_2_E_Color1.fbx"],
-    "tree_oak_1":   ["Tree_3_A_Color1.fbx"],
-    "tree_oak_2":   ["Tree_3_B_Color1.fbx"],
-    "tree_oak_3":   ["Tree_3_C_Color1.fbx"],
-    "tree_round_1": ["Tree_4_A_Color1.fbx"],
-    "tree_round_2": ["Tree_4_B_Color1.fbx"],
-    "tree_round_3": ["Tree_4_C_Color1.fbx"],
+    ("tree_pine",  "Tree_1", "ABC"),
+    ("tree_tall",  "Tree_2", "ABCDE"),
+    ("tree_oak",   "Tree_3", "ABC"),
+    ("tree_round", "Tree_4", "ABC"),
     # Bare trees (dead/winter)
-    "tree_bare_1":  ["Tree_Bare_1_A_Color1.fbx"],
-    "tree_bare_2":  ["Tree_Bare_1_B_Color1.fbx"],
-    "tree_bare_3":  ["Tree_Bare_1_C_Color1.fbx"],
-    "tree_bare_4":  ["Tree_Bare_2_A_Color1.fbx"],
-    "tree_bare_5":  ["Tree_Bare_2_B_Color1.fbx"],
-    "tree_bare_6":  ["Tree_Bare_2_C_Color1.fbx"],
-
+    ("tree_bare",  "Tree_Bare_1", "ABC"),
+    ("tree_bare",  "Tree_Bare_2", "ABC"),
     # === ROCKS (various sizes) ===
-    # Large boulders
-    "rock_boulder_1": ["Rock_1_A_Color1.fbx"],
-    "rock_boulder_2": ["Rock_1_B_Color1.fbx"],
-    "rock_boulder_3": ["Rock_1_C_Color1.fbx"],
-    "rock_boulder_4": ["Rock_1_D_Color1.fbx"],
-    "rock_boulder_5": ["Rock_1_E_Color1.fbx"],
-    "rock_boulder_6": ["Rock_1_F_Color1.fbx"],
-    "rock_boulder_7": ["Rock_1_G_Color1.fbx"],
-    # Medium rocks
-    "rock_medium_1":  ["Rock_2_A_Color1.fbx"],
-    "rock_medium_2":  ["Rock_2_B_Color1.fbx"],
-    "rock_medium_3":  ["Rock_2_C_Color1.fbx"],
-    "rock_medium_4":  ["Rock_2_D_Color1.fbx"],
-    "rock_medium_5":  ["Rock_2_E_Color1.fbx"],
-    "rock_medium_6":  ["Rock_2_F_Color1.fbx"],
-    # Small rocks
-    "rock_small_1":   ["Rock_3_A_Color1.fbx"],
-    "rock_small_2":   ["Rock_3_B_Color1.fbx"],
-    "rock_small_3":   ["Rock_3_C_Color1.fbx"],
-    "rock_small_4":   ["Rock_3_D_Color1.fbx"],
-    "rock_small_5":   ["Rock_3_E_Color1.fbx"],
-    "rock_small_6":   ["Rock_3_F_Color1.fbx"],
-
+    ("rock_boulder", "Rock_1", "ABCDEFG"),  # Large boulders
+    ("rock_medium",  "Rock_2", "ABCDEF"),   # Medium rocks
+    ("rock_small",   "Rock_3", "ABCDEF"),   # Small rocks
     # === BUSHES (variety of shapes) ===
-    "bush_round_1":   ["Bush_1_A_Color1.fbx"],
-    "bush_round_2":   ["Bush_1_B_Color1.fbx"],
-    "bush_round_3":   ["Bush_1_C_Color1.fbx"],
-    "bush_round_4":   ["Bush_1_D_Color1.fbx"],
-    "bush_tall_1":    ["Bush_2_A_Color1.fbx"],
-    "bush_tall_2":    ["Bush_2_B_Color1.fbx"],
-    "bush_tall_3":    ["Bush_2_C_Color1.fbx"],
-    "bush_wide_1":    ["Bush_3_A_Color1.fbx"],
-    "bush_wide_2":    ["Bush_3_B_Color1.fbx"],
-
+    ("bush_round", "Bush_1", "ABCD"),
+    ("bush_tall",  "Bush_2", "ABC"),
+    ("bush_wide",  "Bush_3", "AB"),
     # === GRASS/FERNS (ground cover) ===
-    "grass_1":        ["Grass_1_A_Color1.fbx"],
-    "grass_2":        ["Grass_1_B_Color1.fbx"],
-    "grass_3":        ["Grass_1_C_Color1.fbx"],
-    "grass_4":        ["Grass_1_D_Color1.fbx"],
-    "fern_1":         ["Grass_2_A_Color1.fbx"],
-    "fern_2":         ["Grass_2_B_Color1.fbx"],
-    "fern_3":         ["Grass_2_C_Color1.fbx"],
-    "fern_4":         ["Grass_2_D_Color1.fbx"],
-}
+    ("grass", "Grass_1", "ABCD"),
+    ("fern",  "Grass_2", "ABCD"),
+)
+
+def _kaykit_roles(schema):
+    """Expand KAYKIT_ROLE_SCHEMA into role -> (filename,) entries."""
+    roles = {}
+    counts = {}
+    for prefix, base, letters in schema:
+        for letter in letters:
+            counts[prefix] = counts.get(prefix, 0) + 1
+            roles[f"{prefix}_{counts[prefix]}"] = (f"{base}_{letter}_Color1.fbx",)
+    return roles
+
+# role -> tuple of possible filenames (first match found will be used)
+# Supports GLB, FBX, and OBJ formats
+KAYKIT_ASSET_ROLES_DISABLED = types.MappingProxyType(_kaykit_roles(KAYKIT_ROLE_SCHEMA))
 
 # -------------------------
 # REALISTIC TREE MODELS (Mantissa - CC0 License)
 # High-poly realistic trees for photorealistic scenes
 # -------------------------
-REALISTIC_ASSET_ROLES = {
-    # Japanese Maple variants
-    "real_maple_1":  ["Mantissa_Japanese_Maple_001.FBX"],
-    "real_maple_2":  ["Mantissa_Japanese_Maple_002.FBX"],
-    "real_maple_3":  ["Mantissa_Japanese_Maple_003.FBX"],
-    "real_maple_4":  ["Mantissa_Japanese_Maple_004.FBX"],
-    "real_maple_5":  ["Mantissa_Japanese_Maple_005.FBX"],
-    # Cherry Tree variants
-    "real_cherry_1": ["Mantissa_Cherry_Tree_001.FBX"],
-    "real_cherry_2": ["Mantissa_Cherry_Tree_002.FBX"],
-    "real_cherry_3": ["Mantissa_Cherry_Tree_003.FBX"],
-    "real_cherry_4": ["Mantissa_Cherry_Tree_004.FBX"],
-    "real_cherry_5": ["Mantissa_Cherry_Tree_005.FBX"],
-    # Birch Tree variants
-    "real_birch_1":  ["Mantissa_Birch_001.FBX"],
-    "real_birch_2":  ["Mantissa_Birch_002.FBX"],
-    "real_birch_3":  ["Mantissa_Birch_003.FBX"],
-    "real_birch_4":  ["Mantissa_Birch_004.FBX"],
-    "real_birch_5":  ["Mantissa_Birch_005.FBX"],
-    # Generic Tree variants (10 models)
-    "real_generic_1":  ["Mantissa_Generic_Tree_001.FBX"],
-    "real_generic_2":  ["Mantissa_Generic_Tree_002.FBX"],
-    "real_generic_3":  ["Mantissa_Generic_Tree_003.FBX"],
-    "real_generic_4":  ["Mantissa_Generic_Tree_004.FBX"],
-    "real_generic_5":  ["Mantissa_Generic_Tree_005.FBX"],
-    "real_generic_6":  ["Mantissa_Generic_Tree_006.FBX"],
-    "real_generic_7":  ["Mantissa_Generic_Tree_007.FBX"],
-    "real_generic_8":  ["Mantissa_Generic_Tree_008.FBX"],
-    "real_generic_9":  ["Mantissa_Generic_Tree_009.FBX"],
-    "real_generic_10": ["Mantissa_Generic_Tree_010.FBX"],
-    # Spruce Tree variants
-    "real_spruce_1":  ["Mantissa_Free_Spruce_001.FBX"],
-    "real_spruce_2":  ["Mantissa_Free_Spruce_002.FBX"],
-    "real_spruce_3":  ["Mantissa_Free_Spruce_003.FBX"],
-    "real_spruce_4":  ["Mantissa_Free_Spruce_004.FBX"],
-    "real_spruce_5":  ["Mantissa_Free_Spruce_005.FBX"],
-}
+# Mantissa files are "<Base>_<NNN>.FBX"; rows are (role prefix, file base, variant count)
+REALISTIC_ROLE_SCHEMA = (
+    ("real_maple",   "Mantissa_Japanese_Maple", 5),   # Japanese Maple variants
+    ("real_cherry",  "Mantissa_Cherry_Tree", 5),      # Cherry Tree variants
+    ("real_birch",   "Mantissa_Birch", 5),            # Birch Tree variants
+    ("real_generic", "Mantissa_Generic_Tree", 10),    # Generic Tree variants (10 models)
+    ("real_spruce",  "Mantissa_Free_Spruce", 5),      # Spruce Tree variants
+)
+REALISTIC_ASSET_ROLES = types.MappingProxyType({
+    f"{prefix}_{i}": (f"{base}_{i:03d}.FBX",)
+    for prefix, base, count in REALISTIC_ROLE_SCHEMA
+    for i in range(1, count + 1)
+})
 
 # Folder for realistic assets (separate from KayKit)
 REALISTIC_ASSETS_SUBDIR = "assets/realistic_trees"
@@ -523,21 +695,21 @@ USE_REALISTIC_TREES = False  # Disabled - using KayKit + new trees instead
 # KENNEY NATURE KIT TREES (CC0 License)
 # Higher quality detailed trees from kenney.nl
 # -------------------------
-KENNEY_TREE_ROLES = {
+KENNEY_TREE_ROLES = types.MappingProxyType({
     # Detailed deciduous trees
-    "kenney_detailed_1":    ["tree_detailed.fbx"],
-    "kenney_detailed_2":    ["tree_detailed_dark.fbx"],
-    "kenney_oak_1":         ["tree_oak.fbx"],
-    "kenney_oak_2":         ["tree_oak_dark.fbx"],
-    "kenney_tall":          ["tree_tall.fbx"],
-    "kenney_fat":           ["tree_fat.fbx"],
+    "kenney_detailed_1":    ("tree_detailed.fbx",),
+    "kenney_detailed_2":    ("tree_detailed_dark.fbx",),
+    "kenney_oak_1":         ("tree_oak.fbx",),
+    "kenney_oak_2":         ("tree_oak_dark.fbx",),
+    "kenney_tall":          ("tree_tall.fbx",),
+    "kenney_fat":           ("tree_fat.fbx",),
     # Detailed pine trees
-    "kenney_pine_tall_1":   ["tree_pineTallA_detailed.fbx"],
-    "kenney_pine_tall_2":   ["tree_pineTallB_detailed.fbx"],
-    "kenney_pine_tall_3":   ["tree_pineTallC_detailed.fbx"],
-    "kenney_pine_round_1":  ["tree_pineRoundA.fbx"],
-    "kenney_pine_round_2":  ["tree_pineRoundB.fbx"],
-}
+    "kenney_pine_tall_1":   ("tree_pineTallA_detailed.fbx",),
+    "kenney_pine_tall_2":   ("tree_pineTallB_detailed.fbx",),
+    "kenney_pine_tall_3":   ("tree_pineTallC_detailed.fbx",),
+    "kenney_pine_round_1":  ("tree_pineRoundA.fbx",),
+    "kenney_pine_round_2":  ("tree_pineRoundB.fbx",),
+})
 
 KENNEY_ASSETS_SUBDIR = "assets/kenney_trees"
 
@@ -545,155 +717,152 @@ KENNEY_ASSETS_SUBDIR = "assets/kenney_trees"
 # NEW TREES (user-added OBJ models)
 # -------------------------
 NEW_TREES_SUBDIR = "assets/new_trees"
-NEW_TREE_ROLES = {
-    "new_tree_pack": ["trees9.obj"],  # 9 varied trees in one model
-}
+NEW_TREE_ROLES = types.MappingProxyType({
+    "new_tree_pack": ("trees9.obj",),  # 9 varied trees in one model
+})
 USE_NEW_TREES = False  # Disabled - using HQ trees instead
 
 # -------------------------
 # HIGH-QUALITY 4K TREES (GLB format from Blender exports)
 # -------------------------
 TREES_HQ_SUBDIR = "assets/nature"
-TREES_HQ_ROLES = {
-    "tree_hq_island": ["island_tree_1k.glb"],
-    "tree_hq_pine": ["pine_tree_1k.glb"],
-}
+TREES_HQ_ROLES = types.MappingProxyType({
+    "tree_hq_island": ("island_tree_1k.glb",),
+    "tree_hq_pine": ("pine_tree_1k.glb",),
+})
 USE_HQ_TREES = True  # Enable high-quality tree models (1K for GitHub compatibility)
 
 # Use Kenney trees (higher quality) instead of KayKit
 USE_KENNEY_TREES = False  # Disabled - using photorealistic Mantissa trees instead
 
+# Inverted index over every role table: filename -> [(role, subdir), ...].
+# Lets a directory listing be matched against all known assets in one pass.
+# Names match exactly, like the per-file exists() checks this replaces, and
+# a file listed by several roles is found for each of them.
+ASSET_FILE_INDEX = {}
+for _table, _subdir in (
+    (KAYKIT_ASSET_ROLES, ASSETS_SUBDIR),
+    (REALISTIC_ASSET_ROLES, REALISTIC_ASSETS_SUBDIR),
+    (KENNEY_TREE_ROLES, KENNEY_ASSETS_SUBDIR),
+    (NEW_TREE_ROLES, NEW_TREES_SUBDIR),
+    (TREES_HQ_ROLES, TREES_HQ_SUBDIR),
+):
+    for _role, _files in _table.items():
+        for _fn in _files:
+            ASSET_FILE_INDEX.setdefault(_fn, []).append((_role, _subdir))
+del _table, _subdir, _role, _files, _fn
+
 # Per-asset configuration for spacing, scale, altitude, and rotation
 # ENHANCED with settings from C# Infinite Runner project:
 #   - min_altitude / max_altitude: Height-based spawn constraints
 #   - randomize_y_rotation: Enable random Y-axis rotation
 #   - tilt_angle: Maximum random tilt in degrees (X and Z axes)
-ASSET_PROPERTIES = {
+# Shared defaults every asset family starts from; families below only list
+# the fields that differ.
+ASSET_PROPERTY_BASE = {
+    "min_spacing": 1.0,
+    "scale_range": (0.8, 1.2),
+    "y_offset": 0.0,
+    "min_altitude": -10.0,
+    "max_altitude": 15.0,
+    "randomize_y_rotation": True,
+    "tilt_angle": 2.0,
+}
+
+# (family prefix, variant count, overrides). A count of N expands to
+# "<prefix>_1" .. "<prefix>_N"; a count of 0 registers the prefix itself.
+ASSET_PROPERTY_FAMILIES = (
     # Trees - various sizes and spacing (spawn on lower ground, avoid peaks)
-    "tree_pine_1":  {"min_spacing": 3.0, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "tree_pine_2":  {"min_spacing": 3.0, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "tree_pine_3":  {"min_spacing": 3.0, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "tree_tall_1":  {"min_spacing": 3.5, "scale_range": (0.9, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "tree_tall_2":  {"min_spacing": 3.5, "scale_range": (0.9, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "tree_tall_3":  {"min_spacing": 3.5, "scale_range": (0.9, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "tree_tall_4":  {"min_spacing": 3.5, "scale_range": (0.9, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "tree_tall_5":  {"min_spacing": 3.5, "scale_range": (0.9, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "tree_oak_1":   {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 10.0, "randomize_y_rotation": True, "tilt_angle": 2.5},
-    "tree_oak_2":   {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 10.0, "randomize_y_rotation": True, "tilt_angle": 2.5},
-    "tree_oak_3":   {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 10.0, "randomize_y_rotation": True, "tilt_angle": 2.5},
-    "tree_round_1": {"min_spacing": 3.5, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "tree_round_2": {"min_spacing": 3.5, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "tree_round_3": {"min_spacing": 3.5, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "tree_bare_1":  {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 5.0},
-    "tree_bare_2":  {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 5.0},
-    "tree_bare_3":  {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 5.0},
-    "tree_bare_4":  {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 5.0},
-    "tree_bare_5":  {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 5.0},
-    "tree_bare_6":  {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 5.0},
+    ("tree_pine",  3, {"min_spacing": 3.0, "scale_range": (0.8, 1.3), "max_altitude": 15.0, "tilt_angle": 3.0}),
+    ("tree_tall",  5, {"min_spacing": 3.5, "scale_range": (0.9, 1.5), "max_altitude": 12.0, "tilt_angle": 2.0}),
+    ("tree_oak",   3, {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "max_altitude": 10.0, "tilt_angle": 2.5}),
+    ("tree_round", 3, {"min_spacing": 3.5, "scale_range": (0.8, 1.3), "max_altitude": 12.0, "tilt_angle": 3.0}),
+    ("tree_bare",  6, {"min_spacing": 4.0, "scale_range": (0.9, 1.4), "max_altitude": 20.0, "tilt_angle": 5.0}),
     # Boulders - large rocks, widely spaced (can spawn at higher altitudes)
-    "rock_boulder_1": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "rock_boulder_2": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "rock_boulder_3": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "rock_boulder_4": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "rock_boulder_5": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "rock_boulder_6": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "rock_boulder_7": {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
+    ("rock_boulder", 7, {"min_spacing": 4.0, "scale_range": (1.0, 2.0), "y_offset": -0.2, "max_altitude": 50.0, "tilt_angle": 8.0}),
     # Medium rocks (more tilt variation for natural look)
-    "rock_medium_1":  {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "min_altitude": -10.0, "max_altitude": 40.0, "randomize_y_rotation": True, "tilt_angle": 12.0},
-    "rock_medium_2":  {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "min_altitude": -10.0, "max_altitude": 40.0, "randomize_y_rotation": True, "tilt_angle": 12.0},
-    "rock_medium_3":  {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "min_altitude": -10.0, "max_altitude": 40.0, "randomize_y_rotation": True, "tilt_angle": 12.0},
-    "rock_medium_4":  {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "min_altitude": -10.0, "max_altitude": 40.0, "randomize_y_rotation": True, "tilt_angle": 12.0},
-    "rock_medium_5":  {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "min_altitude": -10.0, "max_altitude": 40.0, "randomize_y_rotation": True, "tilt_angle": 12.0},
-    "rock_medium_6":  {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "min_altitude": -10.0, "max_altitude": 40.0, "randomize_y_rotation": True, "tilt_angle": 12.0},
+    ("rock_medium",  6, {"min_spacing": 2.0, "scale_range": (0.7, 1.4), "y_offset": -0.1, "max_altitude": 40.0, "tilt_angle": 12.0}),
     # Small rocks - can cluster (high tilt for scattered look)
-    "rock_small_1":   {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "min_altitude": -10.0, "max_altitude": 30.0, "randomize_y_rotation": True, "tilt_angle": 15.0},
-    "rock_small_2":   {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "min_altitude": -10.0, "max_altitude": 30.0, "randomize_y_rotation": True, "tilt_angle": 15.0},
-    "rock_small_3":   {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "min_altitude": -10.0, "max_altitude": 30.0, "randomize_y_rotation": True, "tilt_angle": 15.0},
-    "rock_small_4":   {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "min_altitude": -10.0, "max_altitude": 30.0, "randomize_y_rotation": True, "tilt_angle": 15.0},
-    "rock_small_5":   {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "min_altitude": -10.0, "max_altitude": 30.0, "randomize_y_rotation": True, "tilt_angle": 15.0},
-    "rock_small_6":   {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "min_altitude": -10.0, "max_altitude": 30.0, "randomize_y_rotation": True, "tilt_angle": 15.0},
+    ("rock_small",   6, {"min_spacing": 0.8, "scale_range": (0.5, 1.2), "y_offset": -0.05, "max_altitude": 30.0, "tilt_angle": 15.0}),
     # Bushes (slight tilt for organic look)
-    "bush_round_1":   {"min_spacing": 1.5, "scale_range": (0.7, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 4.0},
-    "bush_round_2":   {"min_spacing": 1.5, "scale_range": (0.7, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 4.0},
-    "bush_round_3":   {"min_spacing": 1.5, "scale_range": (0.7, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 4.0},
-    "bush_round_4":   {"min_spacing": 1.5, "scale_range": (0.7, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 4.0},
-    "bush_tall_1":    {"min_spacing": 1.8, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "bush_tall_2":    {"min_spacing": 1.8, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "bush_tall_3":    {"min_spacing": 1.8, "scale_range": (0.8, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 8.0, "randomize_y_rotation": True, "tilt_angle": 3.0},
-    "bush_wide_1":    {"min_spacing": 2.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 6.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "bush_wide_2":    {"min_spacing": 2.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 6.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
+    ("bush_round", 4, {"min_spacing": 1.5, "scale_range": (0.7, 1.2), "max_altitude": 8.0, "tilt_angle": 4.0}),
+    ("bush_tall",  3, {"min_spacing": 1.8, "scale_range": (0.8, 1.3), "max_altitude": 8.0, "tilt_angle": 3.0}),
+    ("bush_wide",  2, {"min_spacing": 2.0, "scale_range": (0.7, 1.1), "max_altitude": 6.0, "tilt_angle": 2.0}),
     # Grass and ferns (high tilt for windswept natural look)
-    "grass_1":        {"min_spacing": 0.4, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 5.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "grass_2":        {"min_spacing": 0.4, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 5.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "grass_3":        {"min_spacing": 0.4, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 5.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "grass_4":        {"min_spacing": 0.4, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 5.0, "randomize_y_rotation": True, "tilt_angle": 8.0},
-    "fern_1":         {"min_spacing": 0.5, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 6.0, "randomize_y_rotation": True, "tilt_angle": 6.0},
-    "fern_2":         {"min_spacing": 0.5, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 6.0, "randomize_y_rotation": True, "tilt_angle": 6.0},
-    "fern_3":         {"min_spacing": 0.5, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 6.0, "randomize_y_rotation": True, "tilt_angle": 6.0},
-    "fern_4":         {"min_spacing": 0.5, "scale_range": (0.6, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 6.0, "randomize_y_rotation": True, "tilt_angle": 6.0},
+    ("grass", 4, {"min_spacing": 0.4, "scale_range": (0.6, 1.1), "max_altitude": 5.0, "tilt_angle": 8.0}),
+    ("fern",  4, {"min_spacing": 0.5, "scale_range": (0.6, 1.1), "max_altitude": 6.0, "tilt_angle": 6.0}),
     # Realistic trees (Mantissa) - larger spacing due to high detail
-    "real_maple_1":   {"min_spacing": 6.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_maple_2":   {"min_spacing": 6.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_maple_3":   {"min_spacing": 6.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_maple_4":   {"min_spacing": 6.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_maple_5":   {"min_spacing": 6.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_cherry_1":  {"min_spacing": 8.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_cherry_2":  {"min_spacing": 8.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_cherry_3":  {"min_spacing": 8.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_cherry_4":  {"min_spacing": 8.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_cherry_5":  {"min_spacing": 8.0, "scale_range": (0.7, 1.1), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
+    ("real_maple",  5, {"min_spacing": 6.0, "scale_range": (0.8, 1.2), "max_altitude": 15.0, "tilt_angle": 2.0}),
+    ("real_cherry", 5, {"min_spacing": 8.0, "scale_range": (0.7, 1.1), "max_altitude": 12.0, "tilt_angle": 1.5}),
     # Birch trees - tall and slender
-    "real_birch_1":   {"min_spacing": 5.0, "scale_range": (0.9, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 18.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_birch_2":   {"min_spacing": 5.0, "scale_range": (0.9, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 18.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_birch_3":   {"min_spacing": 5.0, "scale_range": (0.9, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 18.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_birch_4":   {"min_spacing": 5.0, "scale_range": (0.9, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 18.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_birch_5":   {"min_spacing": 5.0, "scale_range": (0.9, 1.3), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 18.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
+    ("real_birch",  5, {"min_spacing": 5.0, "scale_range": (0.9, 1.3), "max_altitude": 18.0, "tilt_angle": 2.0}),
     # Generic trees - variety of deciduous trees
-    "real_generic_1":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_2":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_3":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_4":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_5":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_6":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_7":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_8":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_9":  {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "real_generic_10": {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
+    ("real_generic", 10, {"min_spacing": 7.0, "scale_range": (0.8, 1.2), "max_altitude": 15.0, "tilt_angle": 2.0}),
     # Spruce trees - coniferous, taller
-    "real_spruce_1":  {"min_spacing": 6.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 25.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_spruce_2":  {"min_spacing": 6.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 25.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_spruce_3":  {"min_spacing": 6.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 25.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_spruce_4":  {"min_spacing": 6.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 25.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "real_spruce_5":  {"min_spacing": 6.0, "scale_range": (0.9, 1.4), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 25.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
+    ("real_spruce", 5, {"min_spacing": 6.0, "scale_range": (0.9, 1.4), "max_altitude": 25.0, "tilt_angle": 1.5}),
     # Kenney Nature Kit trees - higher quality detailed models
-    "kenney_detailed_1":   {"min_spacing": 4.0, "scale_range": (1.5, 2.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "kenney_detailed_2":   {"min_spacing": 4.0, "scale_range": (1.5, 2.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "kenney_oak_1":        {"min_spacing": 5.0, "scale_range": (1.8, 3.0), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "kenney_oak_2":        {"min_spacing": 5.0, "scale_range": (1.8, 3.0), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 12.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "kenney_tall":         {"min_spacing": 4.5, "scale_range": (2.0, 3.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 18.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "kenney_fat":          {"min_spacing": 5.0, "scale_range": (2.0, 3.0), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 10.0, "randomize_y_rotation": True, "tilt_angle": 2.5},
-    "kenney_pine_tall_1":  {"min_spacing": 3.5, "scale_range": (1.5, 2.8), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "kenney_pine_tall_2":  {"min_spacing": 3.5, "scale_range": (1.5, 2.8), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "kenney_pine_tall_3":  {"min_spacing": 3.5, "scale_range": (1.5, 2.8), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-    "kenney_pine_round_1": {"min_spacing": 4.0, "scale_range": (1.8, 3.0), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "kenney_pine_round_2": {"min_spacing": 4.0, "scale_range": (1.8, 3.0), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 15.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
+    ("kenney_detailed",   2, {"min_spacing": 4.0, "scale_range": (1.5, 2.5), "max_altitude": 15.0, "tilt_angle": 2.0}),
+    ("kenney_oak",        2, {"min_spacing": 5.0, "scale_range": (1.8, 3.0), "max_altitude": 12.0, "tilt_angle": 2.0}),
+    ("kenney_tall",       0, {"min_spacing": 4.5, "scale_range": (2.0, 3.5), "max_altitude": 18.0, "tilt_angle": 1.5}),
+    ("kenney_fat",        0, {"min_spacing": 5.0, "scale_range": (2.0, 3.0), "max_altitude": 10.0, "tilt_angle": 2.5}),
+    ("kenney_pine_tall",  3, {"min_spacing": 3.5, "scale_range": (1.5, 2.8), "max_altitude": 20.0, "tilt_angle": 1.5}),
+    ("kenney_pine_round", 2, {"min_spacing": 4.0, "scale_range": (1.8, 3.0), "max_altitude": 15.0, "tilt_angle": 2.0}),
     # New user-added trees (OBJ models - 9 varied trees)
-    "new_tree_pack": {"min_spacing": 4.0, "scale_range": (0.08, 0.12), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 50.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
+    ("new_tree_pack", 0, {"min_spacing": 4.0, "scale_range": (0.08, 0.12), "max_altitude": 50.0, "tilt_angle": 2.0}),
     # High-quality trees (GLB format from 4K Blender models) - wider spacing for performance
-    "tree_hq_island": {"min_spacing": 20.0, "scale_range": (0.8, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 20.0, "randomize_y_rotation": True, "tilt_angle": 2.0},
-    "tree_hq_pine": {"min_spacing": 20.0, "scale_range": (0.8, 1.5), "y_offset": 0.0, "min_altitude": -10.0, "max_altitude": 25.0, "randomize_y_rotation": True, "tilt_angle": 1.5},
-}
+    ("tree_hq_island", 0, {"min_spacing": 20.0, "scale_range": (0.8, 1.5), "max_altitude": 20.0, "tilt_angle": 2.0}),
+    ("tree_hq_pine",   0, {"min_spacing": 20.0, "scale_range": (0.8, 1.5), "max_altitude": 25.0, "tilt_angle": 1.5}),
+)
+
+@dataclass(frozen=True)
+class AssetProps:
+    """Resolved placement settings for one asset role."""
+    __slots__ = ("min_spacing", "scale_lo", "scale_hi", "y_offset",
+                 "min_altitude", "max_altitude", "randomize_y_rotation", "tilt_angle")
+    min_spacing: float
+    scale_lo: float
+    scale_hi: float
+    y_offset: float
+    min_altitude: float
+    max_altitude: float
+    randomize_y_rotation: bool
+    tilt_angle: float
+
+    @property
+    def scale_range(self):
+        return (self.scale_lo, self.scale_hi)
+
+
+def _asset_props(fields):
+    """Build an AssetProps record from a config dict using the scale_range key."""
+    scale_lo, scale_hi = fields["scale_range"]
+    return AssetProps(fields["min_spacing"], scale_lo, scale_hi, fields["y_offset"],
+                      fields["min_altitude"], fields["max_altitude"],
+                      fields["randomize_y_rotation"], fields["tilt_angle"])
+
+
+ASSET_PROPERTIES = {}
+for _prefix, _count, _overrides in ASSET_PROPERTY_FAMILIES:
+    # Records are immutable, so every variant of a family shares one instance
+    _props = _asset_props({**ASSET_PROPERTY_BASE, **_overrides})
+    if _count:
+        ASSET_PROPERTIES.update(dict.fromkeys(
+            [f"{_prefix}_{_i}" for _i in range(1, _count + 1)], _props))
+    else:
+        ASSET_PROPERTIES[_prefix] = _props
+del _prefix, _count, _overrides, _props
 
 # Default properties for unknown assets
-DEFAULT_ASSET_PROPS = {
-    "min_spacing": 1.0,
-    "scale_range": (0.8, 1.2),
-    "y_offset": 0.0,
-    "min_altitude": -100.0,  # No lower limit by default
-    "max_altitude": 100.0,   # No upper limit by default
-    "randomize_y_rotation": True,
-    "tilt_angle": 5.0,
-}
+DEFAULT_ASSET_PROPS = AssetProps(
+    min_spacing=1.0,
+    scale_lo=0.8,
+    scale_hi=1.2,
+    y_offset=0.0,
+    min_altitude=-100.0,  # No lower limit by default
+    max_altitude=100.0,   # No upper limit by default
+    randomize_y_rotation=True,
+    tilt_angle=5.0,
+)
 
 # Biome definitions - weights for each asset category
 # NOTE: Only trees enabled - KayKit assets removed
@@ -771,35 +940,51 @@ REALISTIC_TREE_CATEGORY = [
     "real_cherry_1", "real_cherry_2", "real_cherry_3", "real_cherry_4", "real_cherry_5",
 ]
 
-ASSET_CATEGORIES = {
+ASSET_CATEGORIES = types.MappingProxyType({
     "trees": (
-        ["tree_hq_island", "tree_hq_pine"] if USE_HQ_TREES else
-        ["new_tree_pack"] if USE_NEW_TREES else [
+        ("tree_hq_island", "tree_hq_pine") if USE_HQ_TREES else
+        ("new_tree_pack",) if USE_NEW_TREES else (
             # KayKit trees only when other trees disabled
             "tree_pine_1", "tree_pine_2", "tree_pine_3",
             "tree_tall_1", "tree_tall_2", "tree_tall_3", "tree_tall_4", "tree_tall_5",
             "tree_oak_1", "tree_oak_2", "tree_oak_3",
             "tree_round_1", "tree_round_2", "tree_round_3",
-        ]
+        )
     ),
-    "trees_bare": [
+    "trees_bare": (
         "tree_bare_1", "tree_bare_2", "tree_bare_3",
         "tree_bare_4", "tree_bare_5", "tree_bare_6",
-    ],
-    "boulders": [],  # KayKit assets removed
-    "rocks": [],  # KayKit assets removed
-    "bushes": [],  # KayKit assets removed
-    "ferns": [],  # KayKit assets removed
-    "grass": [],  # KayKit assets removed
-    "trees_realistic": [
+    ),
+    "boulders": (),  # KayKit assets removed
+    "rocks": (),  # KayKit assets removed
+    "bushes": (),  # KayKit assets removed
+    "ferns": (),  # KayKit assets removed
+    "grass": (),  # KayKit assets removed
+    "trees_realistic": (
         "real_maple_1", "real_maple_2", "real_maple_3", "real_maple_4", "real_maple_5",
         "real_cherry_1", "real_cherry_2", "real_cherry_3", "real_cherry_4", "real_cherry_5",
         "real_birch_1", "real_birch_2", "real_birch_3", "real_birch_4", "real_birch_5",
         "real_generic_1", "real_generic_2", "real_generic_3", "real_generic_4", "real_generic_5",
         "real_generic_6", "real_generic_7", "real_generic_8", "real_generic_9", "real_generic_10",
         "real_spruce_1", "real_spruce_2", "real_spruce_3", "real_spruce_4", "real_spruce_5",
-    ],
-}
+    ),
+})
+
+# Per-biome (category, weight) pairs with zero-weight categories dropped, so
+# the choice tables never carry entries that can't be drawn
+BIOME_CATEGORY_WEIGHTS = types.MappingProxyType({
+    biome: tuple((category, weight) for category, weight in weights.items()
+                 if weight > 0 and ASSET_CATEGORIES.get(category))
+    for biome, weights in BIOMES.items()
+})
+
+# Biome names in BIOMES order, for the per-segment biome draw
+BIOME_NAMES = tuple(BIOMES)
+
+# Inverted index: asset role -> the category it belongs to
+ASSET_TO_CATEGORY = types.MappingProxyType({
+    role: category for category, roles in ASSET_CATEGORIES.items() for role in roles
+})
 
 # -------------------------
 # ENVIRONMENT PRESETS
@@ -948,10 +1133,18 @@ ENVIRONMENT_PRESETS = {
 # Options: "forest_park", "autumn_forest", "desert_canyon", "snowy_peaks", "train_yard"
 ACTIVE_PRESET = "forest_park"
 
+# ACTIVE_PRESET is a source-level setting, so the lookup is resolved once at import
+_ACTIVE_PRESET_CACHE = ENVIRONMENT_PRESETS.get(ACTIVE_PRESET) or ENVIRONMENT_PRESETS["forest_park"]
+
 def get_preset():
     """Get the active environment preset with defaults."""
-    preset = ENVIRONMENT_PRESETS.get(ACTIVE_PRESET, ENVIRONMENT_PRESETS["forest_park"])
-    return preset
+    return _ACTIVE_PRESET_CACHE
+
+# Feature toggles of the active preset, resolved once (missing flags default to on)
+_features = _ACTIVE_PRESET_CACHE.get("features", {})
+FEATURE_WATER_PONDS = bool(_features.get("water_ponds", True))
+FEATURE_PARTICLES = bool(_features.get("particles", True))
+del _features
 
 # -------------------------
 # STEP 1 - FIND THE ZIP
@@ -961,27 +1154,30 @@ def find_kaykit_zip():
     """Look for the KayKit Forest zip in the script directory."""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     patterns = [
-        os.path.join(script_dir, "KayKit_Forest*.zip"),
-        os.path.join(script_dir, "kaykit*forest*.zip"),
-        os.path.join(script_dir, "kaykit*.zip"),
-        os.path.join(script_dir, "*.zip"),
+        "KayKit_Forest*.zip",
+        "kaykit*forest*.zip",
+        "kaykit*.zip",
+        "*.zip",
     ]
+    # List the directory once and test every pattern against that listing
+    with os.scandir(script_dir) as it:
+        names = [e.name for e in it if e.is_file()]
     for pattern in patterns:
-        matches = glob.glob(pattern, recursive=False)
-        if matches:
-            return matches[0]
+        for name in names:
+            if fnmatch.fnmatch(name, pattern):
+                return os.path.join(script_dir, name)
     return None
 
-def list_model_files_in_zip(zip_path):
-    """Return a dict of basename -> full_zip_path for all model files in the zip."""
-    model_map = {}
-    supported_ext = (".glb", ".fbx", ".obj")
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for name in zf.namelist():
-            if name.lower().endswith(supported_ext):
-                basename = os.path.basename(name)
-                model_map[basename] = name
-    return model_map
+def list_model_files_in_zip(zf):
+    """Return a dict of basename -> full_zip_path for all model files in the open zip."""
+    # Every supported extension is four characters, so only that suffix is lowered
+    supported_ext = {".glb", ".fbx", ".obj"}
+    basename = os.path.basename
+    return {
+        basename(info.filename): info.filename
+        for info in zf.infolist()
+        if info.filename[-4:].lower() in supported_ext
+    }
 
 # -------------------------
 # STEP 2 - EXTRACT AND ORGANISE ASSETS
@@ -1001,47 +1197,68 @@ def setup_godot_project(project_dir):
             f.write('config/features=PackedStringArray("4.3", "Forward Plus")\n')
         print(f"  Created minimal project.godot in {project_dir}")
 
-def extract_assets(zip_path, model_map, role_map, assets_dir):
+def extract_assets(zf, model_map, role_map, assets_dir):
     """
-    Extract model files for each role into assets_dir.
+    Extract model files for each role from the open zip into assets_dir.
     Returns a dict of role -> model filename for roles that were found.
-    Skips extraction if the file already exists.
+    Skips extraction if the file already matches its zip member (see is_extracted).
     """
     os.makedirs(assets_dir, exist_ok=True)
     resolved = {}
+    jobs = {}  # dest_path -> zip member, copied together once every role is matched
 
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for role, candidates in role_map.items():
-            for candidate in candidates:
-                if candidate in model_map:
-                    dest_path = os.path.join(assets_dir, candidate)
-                    if os.path.exists(dest_path):
-                        resolved[role] = candidate
-                        print(f"  Skipped [{role}] <- {candidate} (exists)")
-                    else:
-                        with zf.open(model_map[candidate]) as src, open(dest_path, "wb") as dst:
-                            shutil.copyfileobj(src, dst)
-                        resolved[role] = candidate
-                        print(f"  Extracted [{role}] <- {candidate}")
-                    break
+    for role, candidates in role_map.items():
+        for candidate in candidates:
+            if candidate in model_map:
+                dest_path = os.path.join(assets_dir, candidate)
+                if dest_path in jobs or is_extracted(zf, model_map[candidate], dest_path):
+                    resolved[role] = candidate
+                    print(f"  Skipped [{role}] <- {candidate} (exists)")
+                else:
+                    jobs[dest_path] = model_map[candidate]
+                    resolved[role] = candidate
+                    print(f"  Extracted [{role}] <- {candidate}")
+                break
 
+    extract_zip_members(zf, [(member, dest) for dest, member in jobs.items()])
     return resolved
 
-def extract_textures(zip_path, assets_dir):
+def extract_textures(zf, assets_dir):
     """
-    Extract texture files from the KayKit zip to assets directory.
+    Extract texture files from the open KayKit zip to assets directory.
     The FBX models reference these textures for their materials.
     """
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for name in zf.namelist():
-            # Look for texture files (png, jpg, etc) in fbx folder
-            if name.endswith('.png') and '/fbx/' in name.lower() and 'unity' not in name.lower():
-                texture_name = os.path.basename(name)
-                dest_path = os.path.join(assets_dir, texture_name)
-                if not os.path.exists(dest_path):
-                    with zf.open(name) as src, open(dest_path, "wb") as dst:
-                        shutil.copyfileobj(src, dst)
-                    print(f"  Extracted texture: {texture_name}")
+    jobs = {}
+    for info in zf.infolist():
+        name = info.filename
+        # Look for texture files (png, jpg, etc) in fbx folder
+        if name.endswith('.png') and '/fbx/' in name.lower() and 'unity' not in name.lower():
+            texture_name = os.path.basename(name)
+            dest_path = os.path.join(assets_dir, texture_name)
+            if dest_path not in jobs and not is_extracted(zf, info, dest_path):
+                jobs[dest_path] = info
+                print(f"  Extracted texture: {texture_name}")
+    extract_zip_members(zf, [(info, dest) for dest, info in jobs.items()])
+
+def find_role_files(directory, role_map):
+    """
+    Match the files in directory against role_map using ASSET_FILE_INDEX.
+    Returns a dict of role -> (filename, subdir) in role_map order. The
+    directory is listed once instead of probing every candidate path.
+    """
+    found = {}
+    with os.scandir(directory) as it:
+        names = [e.name for e in it if e.is_file()]
+    for name in names:
+        for role, subdir in ASSET_FILE_INDEX.get(name, ()):
+            ranked = role_map.get(role)
+            if ranked is None or name not in ranked:
+                continue
+            # Several candidates present - keep the one listed first
+            if role in found and ranked.index(name) > ranked.index(found[role][0]):
+                continue
+            found[role] = (name, subdir)
+    return {role: found[role] for role in role_map if role in found}
 
 def load_realistic_assets(project_dir):
     """
@@ -1054,80 +1271,136 @@ def load_realistic_assets(project_dir):
         return {}
 
     resolved = {}
-    for role, candidates in REALISTIC_ASSET_ROLES.items():
-        for candidate in candidates:
-            src_path = os.path.join(realistic_dir, candidate)
-            if os.path.exists(src_path):
-                resolved[role] = candidate
-                print(f"  Loaded realistic [{role}] <- {candidate}")
-                break
+    for role, (filename, _) in find_role_files(realistic_dir, REALISTIC_ASSET_ROLES).items():
+        resolved[role] = filename
+        print(f"  Loaded realistic [{role}] <- {filename}")
 
     # Copy textures to the realistic assets folder if needed
     textures_dir = os.path.join(realistic_dir, "Textures")
     if os.path.exists(textures_dir):
-        for tex_file in os.listdir(textures_dir):
-            src = os.path.join(textures_dir, tex_file)
-            dst = os.path.join(realistic_dir, tex_file)
-            if os.path.isfile(src) and not os.path.exists(dst):
-                shutil.copy2(src, dst)
-                print(f"  Copied texture: {tex_file}")
+        # scandir reports the file type from the directory listing, no stat per entry
+        with os.scandir(textures_dir) as it:
+            tex_entries = [e for e in it if e.is_file()]
+        for entry in tex_entries:
+            dst = os.path.join(realistic_dir, entry.name)
+            if not os.path.exists(dst):
+                shutil.copy2(entry.path, dst)
+                print(f"  Copied texture: {entry.name}")
 
     return resolved
 
-def fuzzy_resolve_assets(zip_path, model_map, missing_roles, role_map, assets_dir):
+def fuzzy_resolve_assets(zf, model_map, missing_roles, role_map, assets_dir):
     """
     Case-insensitive fuzzy match for roles that were not found by exact name.
-    Also extracts the matched files.
+    Also extracts the matched files from the open zip.
     """
     resolved = {}
-    available = list(model_map.keys())
-
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for role in missing_roles:
-            candidates = role_map[role]
-            keywords = [c.lower().replace(".glb", "").replace("_", "") for c in candidates]
-
-            for avail in available:
-                avail_key = avail.lower().replace(".glb", "").replace("_", "")
-                for kw in keywords:
-                    if kw in avail_key or avail_key in kw:
-                        dest_path = os.path.join(assets_dir, avail)
-                        if os.path.exists(dest_path):
-                            print(f"  Skipped fuzzy [{role}] <- {avail} (exists)")
-                        else:
-                            with zf.open(model_map[avail]) as src, open(dest_path, "wb") as dst:
-                                shutil.copyfileobj(src, dst)
-                            print(f"  Fuzzy match  [{role}] <- {avail}")
-                        resolved[role] = avail
-                        break
-                if role in resolved:
+    jobs = {}
+    # Normalised match keys are computed once per file, not once per role
+    available = [(avail, avail.lower().replace(".glb", "").replace("_", "")) for avail in model_map]
+
+    for role in missing_roles:
+        candidates = role_map[role]
+        keywords = [c.lower().replace(".glb", "").replace("_", "") for c in candidates]
+
+        for avail, avail_key in available:
+            for kw in keywords:
+                if kw in avail_key or avail_key in kw:
+                    dest_path = os.path.join(assets_dir, avail)
+                    if dest_path in jobs or is_extracted(zf, model_map[avail], dest_path):
+                        print(f"  Skipped fuzzy [{role}] <- {avail} (exists)")
+                    else:
+                        jobs[dest_path] = model_map[avail]
+                        print(f"  Fuzzy match  [{role}] <- {avail}")
+                    resolved[role] = avail
                     break
+            if role in resolved:
+                break
 
+    extract_zip_members(zf, [(member, dest) for dest, member in jobs.items()])
     return resolved
 
 # -------------------------
 # STEP 3 - GENERATE .TSCN WRAPPER SCENES FOR EACH MODEL
 # -------------------------
 
+UID_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+def stable_hash(text):
+    """CRC-32 of text; unlike hash(), identical in every Python process."""
+    return zlib.crc32(text.encode("utf-8"))
+
+@functools.lru_cache(maxsize=None)
 def _make_uid(seed_val):
-    r = random.Random(int(seed_val) & 0xFFFFFFFF)
-    chars = "abcdefghijklmnopqrstuvwxyz0123456789"
-    return "uid://" + "".join(r.choice(chars) for _ in range(12))
-
-def write_model_wrapper_scene(model_filename, scene_path, res_assets_path):
-    """Write a minimal .tscn that instances the model file directly."""
-    model_res_path = f"{res_assets_path}/{model_filename}"
-    scene_name   = os.path.splitext(model_filename)[0]
-    scene_uid    = _make_uid(hash(model_filename))
-    model_uid    = _make_uid(hash(model_filename) + 1)
-
-    content = (
-        f'[gd_scene load_steps=2 format=3 uid="{scene_uid}"]\n\n'
-        f'[ext_resource type="PackedScene" uid="{model_uid}" path="{model_res_path}" id="1_{scene_name}"]\n\n'
-        f'[node name="{scene_name}" instance=ExtResource("1_{scene_name}")]\n'
+    # One 62-bit draw spelled out in base 36 (36**12 > 2**62) instead of
+    # twelve separate choice() calls
+    n = random.Random(int(seed_val) & 0xFFFFFFFF).getrandbits(62)
+    chars = []
+    for _ in range(12):
+        n, d = divmod(n, 36)
+        chars.append(UID_ALPHABET[d])
+    return "uid://" + "".join(chars)
+
+def write_scene_file(path, text):
+    """
+    Write a generated text resource in one go.
+    The text is encoded once and handed to a single binary write, which also
+    keeps Godot's LF line endings on every platform.
+    """
+    _write_scene_data(path, text.encode("utf-8"))
+
+def _write_scene_data(path, data):
+    """The single binary write behind write_scene_file and update_scene_file."""
+    with open(path, "wb") as f:
+        f.write(data)
+
+def update_scene_file(path, text):
+    """
+    write_scene_file, skipped when path already holds exactly this text.
+    Unchanged scenes keep their mtime, so re-runs do not touch them and
+    Godot has nothing to reimport. Returns True if the file was written.
+    """
+    data = text.encode("utf-8")
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    return False
+    except OSError:
+        pass
+    _write_scene_data(path, data)
+    return True
+
+SCENE_WRITE_CHUNK_LINES = 8192
+SCENE_WRITE_BUFFER_SIZE = 1 << 20
+
+def write_scene_lines(path, lines):
+    """
+    Write lines joined by newlines, like write_scene_file(path, "\n".join(lines)),
+    without building the whole text and its encoded copy in memory: lines are
+    joined and encoded a chunk at a time into a large write buffer.
+    """
+    with open(path, "wb", buffering=SCENE_WRITE_BUFFER_SIZE) as f:
+        write = f.write
+        for start in range(0, len(lines), SCENE_WRITE_CHUNK_LINES):
+            if start:
+                write(b"\n")
+            write("\n".join(lines[start:start + SCENE_WRITE_CHUNK_LINES]).encode("utf-8"))
+
+WRAPPER_SCENE_TEMPLATE = (
+    '[gd_scene load_steps=2 format=3 uid="%s"]\n\n'
+    '[ext_resource type="PackedScene" uid="%s" path="%s/%s" id="1_%s"]\n\n'
+    '[node name="%s" instance=ExtResource("1_%s")]\n'
+)
+
+def wrapper_scene_text(model_filename, scene_name, res_assets_path):
+    """Text of a minimal .tscn named scene_name that instances model_filename."""
+    # Stable across runs so Godot keeps the same references on regeneration
+    seed = stable_hash(model_filename)
+    return WRAPPER_SCENE_TEMPLATE % (
+        _make_uid(seed), _make_uid(seed + 1), res_assets_path, model_filename,
+        scene_name, scene_name, scene_name,
     )
-    with open(scene_path, "w", encoding="utf-8") as f:
-        f.write(content)
 
 def generate_wrapper_scenes(resolved_roles, assets_dir, res_assets_path):
     """
@@ -1135,12 +1408,17 @@ def generate_wrapper_scenes(resolved_roles, assets_dir, res_assets_path):
     Returns a dict of role -> res:// .tscn path
     """
     tscn_paths = {}
+    pending = {}  # scene_path -> text; models shared by several roles are written once
     for role, model_filename in resolved_roles.items():
-        scene_name = os.path.splitext(model_filename)[0] + ".tscn"
-        scene_path = os.path.join(assets_dir, scene_name)
-        write_model_wrapper_scene(model_filename, scene_path, res_assets_path)
-        tscn_paths[role] = f"{res_assets_path}/{scene_name}"
-        print(f"  Wrapper scene: {scene_name}")
+        scene_name = os.path.splitext(model_filename)[0]
+        scene_file = scene_name + ".tscn"
+        scene_path = os.path.join(assets_dir, scene_file)
+        if scene_path not in pending:
+            pending[scene_path] = wrapper_scene_text(model_filename, scene_name, res_assets_path)
+        tscn_paths[role] = f"{res_assets_path}/{scene_file}"
+        print(f"  Wrapper scene: {scene_file}")
+    for scene_path, text in pending.items():
+        update_scene_file(scene_path, text)
     return tscn_paths
 
 # -------------------------
@@ -1153,8 +1431,8 @@ def write_player_scene(project_dir):
     os.makedirs(scripts_dir, exist_ok=True)
 
     player_scene_path = os.path.join(project_dir, "player.tscn")
-    scene_uid = _make_uid(hash("player_scene"))
-    script_uid = _make_uid(hash("player_script"))
+    scene_uid = _make_uid(stable_hash("player_scene"))
+    script_uid = _make_uid(stable_hash("player_script"))
 
     content = f'''[gd_scene load_steps=3 format=3 uid="{scene_uid}"]
 
@@ -1179,8 +1457,7 @@ current = true
 fov = 75.0
 far = 10000.0
 '''
-    with open(player_scene_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    update_scene_file(player_scene_path, content)
 
     return "res://player.tscn"
 
@@ -1188,6 +1465,71 @@ far = 10000.0
 # STEP 3.6 - ENVIRONMENT NODES (Ground, Light, Sky)
 # -------------------------
 
+# Light transform line: a %.4f basis and a verbatim origin (e.g. "0, 20, 0")
+LIGHT_TRANSFORM_TEMPLATE = (
+    "transform = Transform3D(%.4f, %.4f, %.4f, %.4f, %.4f, %.4f, %.4f, %.4f, %.4f, %s)"
+)
+
+def sun_basis(angle_x, angle_y):
+    """
+    Row-major 3x3 basis for a light rotated angle_x then angle_y degrees
+    (combined Y * X rotation), shared by every sun node writer.
+    """
+    rot_x_rad = math.radians(angle_x)
+    rot_y_rad = math.radians(angle_y)
+    cx, sx = math.cos(rot_x_rad), math.sin(rot_x_rad)
+    cy, sy = math.cos(rot_y_rad), math.sin(rot_y_rad)
+    return (
+        cy, sx * sy, -cx * sy,
+        0,  cx,      sx,
+        sy, -sx * cy, cx * cy,
+    )
+
+@functools.lru_cache(maxsize=None)
+def sun_shadow_lines(quality):
+    """
+    Shadow property lines of the map scene's sun for a graphics quality
+    preset. They depend on nothing else, so each quality is formatted once.
+    """
+    gfx = GRAPHICS_PRESETS.get(quality, GRAPHICS_ULTRA)
+    if not gfx.get("shadow_enabled", True):
+        return ()
+
+    lines = [
+        'shadow_enabled = true',
+        f'shadow_bias = {gfx.get("shadow_bias", 0.02)}',
+        f'shadow_normal_bias = {gfx.get("shadow_normal_bias", 1.0)}',
+    ]
+    if "shadow_blur" in gfx:
+        lines.append(f'shadow_blur = {gfx["shadow_blur"]}')
+    if "shadow_transmittance_bias" in gfx:
+        lines.append(f'shadow_transmittance_bias = {gfx["shadow_transmittance_bias"]}')
+
+    # Directional shadow settings (PSSM)
+    shadow_mode = gfx.get("directional_shadow_mode", 2)  # 0=Orthogonal, 1=PSSM 2 Splits, 2=PSSM 4 Splits
+    lines.append(f'directional_shadow_mode = {shadow_mode}')
+
+    if shadow_mode >= 1:  # PSSM modes
+        if "directional_shadow_split_1" in gfx:
+            lines.append(f'directional_shadow_split_1 = {gfx["directional_shadow_split_1"]}')
+        if "directional_shadow_split_2" in gfx:
+            lines.append(f'directional_shadow_split_2 = {gfx["directional_shadow_split_2"]}')
+        if shadow_mode == 2 and "directional_shadow_split_3" in gfx:
+            lines.append(f'directional_shadow_split_3 = {gfx["directional_shadow_split_3"]}')
+        if gfx.get("directional_shadow_blend_splits", True):
+            lines.append('directional_shadow_blend_splits = true')
+
+    lines.append(f'directional_shadow_max_distance = {gfx.get("directional_shadow_max_distance", 200.0)}')
+    if "directional_shadow_fade_start" in gfx:
+        lines.append(f'directional_shadow_fade_start = {gfx["directional_shadow_fade_start"]}')
+    return tuple(lines)
+
+# The map scene's mid-day sun never moves, so its transform line is built once
+MAP_SUN_ANGLE_X = -50.0
+MAP_SUN_ANGLE_Y = -30.0
+MAP_SUN_TRANSFORM_LINE = LIGHT_TRANSFORM_TEMPLATE % (
+    *sun_basis(MAP_SUN_ANGLE_X, MAP_SUN_ANGLE_Y), "0, 50, 0")
+
 def write_environment_nodes():
     """
     Generate TSCN node definitions for environment: ground plane, sunlight, and sky.
@@ -1202,18 +1544,10 @@ def write_environment_nodes():
     lines.append("")
 
     # DirectionalLight3D - sun
-    rot_x_rad = math.radians(SUN_ROTATION_X)
-    rot_y_rad = math.radians(SUN_ROTATION_Y)
-    # Build rotation matrix for X then Y rotation
-    cx, sx = math.cos(rot_x_rad), math.sin(rot_x_rad)
-    cy, sy = math.cos(rot_y_rad), math.sin(rot_y_rad)
-    # Combined rotation matrix (Y * X)
-    m00, m01, m02 = cy, sx*sy, -cx*sy
-    m10, m11, m12 = 0, cx, sx
-    m20, m21, m22 = sy, -sx*cy, cx*cy
+    basis = sun_basis(SUN_ROTATION_X, SUN_ROTATION_Y)
 
     lines.append('[node name="Sun" type="DirectionalLight3D" parent="."]')
-    lines.append(f'transform = Transform3D({m00:.4f}, {m01:.4f}, {m02:.4f}, {m10:.4f}, {m11:.4f}, {m12:.4f}, {m20:.4f}, {m21:.4f}, {m22:.4f}, 0, 20, 0)')
+    lines.append(LIGHT_TRANSFORM_TEMPLATE % (*basis, "0, 20, 0"))
     lines.append('shadow_enabled = true')
     lines.append('light_energy = 1.8')
     lines.append('light_color = Color(1.0, 0.98, 0.9, 1)')
@@ -1227,14 +1561,334 @@ def write_environment_nodes():
 
     return lines
 
+# Constant sub_resource text. The *_TEMPLATE blocks only take resource ids
+# (their own first, then any SubResource they reference) via %.
+
+# Terrain texture layers (grass, dirt, rock, snow) and blend settings
+GROUND_LAYERS_BLOCK = (
+    # Layer 1 - Grass (low areas)
+    'shader_parameter/albedo_tex_1 = ExtResource("grass_albedo")\n'
+    'shader_parameter/normal_tex_1 = ExtResource("grass_normal")\n'
+    'shader_parameter/roughness_tex_1 = ExtResource("grass_roughness")\n'
+    'shader_parameter/uv_scale_1 = 25.0\n'
+    'shader_parameter/height_min_1 = -10.0\n'
+    'shader_parameter/height_max_1 = 10.0\n'
+
+    # Layer 2 - Dirt (mid areas, paths)
+    'shader_parameter/albedo_tex_2 = ExtResource("dirt_albedo")\n'
+    'shader_parameter/normal_tex_2 = ExtResource("dirt_normal")\n'
+    'shader_parameter/roughness_tex_2 = ExtResource("dirt_roughness")\n'
+    'shader_parameter/uv_scale_2 = 30.0\n'
+    'shader_parameter/height_min_2 = 5.0\n'
+    'shader_parameter/height_max_2 = 25.0\n'
+
+    # Layer 3 - Rock (high areas, cliffs)
+    'shader_parameter/albedo_tex_3 = ExtResource("rock_albedo")\n'
+    'shader_parameter/normal_tex_3 = ExtResource("rock_normal")\n'
+    'shader_parameter/roughness_tex_3 = ExtResource("rock_roughness")\n'
+    'shader_parameter/uv_scale_3 = 20.0\n'
+    'shader_parameter/height_min_3 = 20.0\n'
+    'shader_parameter/height_max_3 = 50.0\n'
+
+    # Layer 4 - Snow (peaks)
+    'shader_parameter/albedo_tex_4 = ExtResource("snow_albedo")\n'
+    'shader_parameter/normal_tex_4 = ExtResource("snow_normal")\n'
+    'shader_parameter/roughness_tex_4 = ExtResource("snow_roughness")\n'
+    'shader_parameter/uv_scale_4 = 35.0\n'
+    'shader_parameter/height_min_4 = 40.0\n'
+    'shader_parameter/height_max_4 = 100.0\n'
+
+    # Blending settings
+    'shader_parameter/blend_sharpness = 2.0\n'
+    'shader_parameter/slope_threshold = 0.6\n'
+    'shader_parameter/slope_blend = 0.15\n'
+    'shader_parameter/use_triplanar = true\n'
+    'shader_parameter/triplanar_sharpness = 4.0\n'
+    '\n'
+)
+
+# Pond water shader material
+WATER_MATERIAL_TEMPLATE = (
+    '[sub_resource type="ShaderMaterial" id="%d"]\n'
+    'render_priority = 1\n'
+    'shader = ExtResource("water_shader")\n'
+    'shader_parameter/water_color = Vector3(0.1, 0.3, 0.5)\n'
+    'shader_parameter/foam_color = Vector3(0.8, 0.9, 1.0)\n'
+    'shader_parameter/wave_speed = 0.5\n'
+    'shader_parameter/wave_height = 0.08\n'
+    'shader_parameter/wave_frequency = 2.0\n'
+    'shader_parameter/transparency = 0.7\n'
+    '\n'
+)
+
+# Grass MultiMesh material with wind animation
+GRASS_MATERIAL_TEMPLATE = (
+    '[sub_resource type="ShaderMaterial" id="%d"]\n'
+    'shader = ExtResource("grass_shader")\n'
+    'shader_parameter/grass_texture = ExtResource("grass_blade")\n'
+    'shader_parameter/grass_color_base = Vector3(0.15, 0.35, 0.1)\n'
+    'shader_parameter/grass_color_tip = Vector3(0.35, 0.55, 0.2)\n'
+    'shader_parameter/color_variation = 0.08\n'
+    'shader_parameter/alpha_scissor = 0.4\n'
+    'shader_parameter/wind_strength = 0.4\n'
+    'shader_parameter/wind_speed = 1.2\n'
+    'shader_parameter/wind_direction = Vector2(1.0, 0.3)\n'
+    'shader_parameter/wind_turbulence = 0.25\n'
+    'shader_parameter/wind_noise = ExtResource("wind_noise")\n'
+    'shader_parameter/wind_noise_scale = 0.08\n'
+    'shader_parameter/fade_start = 60.0\n'
+    'shader_parameter/fade_end = 100.0\n'
+    'shader_parameter/subsurface_strength = 0.4\n'
+    'shader_parameter/subsurface_color = Vector3(0.5, 0.75, 0.3)\n'
+    '\n'
+)
+
+# Path/trail material (dirt brown)
+PATH_MATERIAL_TEMPLATE = (
+    '[sub_resource type="StandardMaterial3D" id="%d"]\n'
+    'albedo_color = Color(0.45, 0.35, 0.25, 1)\n'
+    'albedo_texture = SubResource("%d")\n'
+    'uv1_scale = Vector3(10, 10, 1)\n'
+    'roughness = 0.85\n'
+    '\n'
+)
+
+# Water mesh (circular pond)
+WATER_MESH_TEMPLATE = (
+    '[sub_resource type="CylinderMesh" id="%d"]\n'
+    'top_radius = 1.0\n'
+    'bottom_radius = 1.0\n'
+    'height = 0.1\n'
+    'radial_segments = 24\n'
+    'material = SubResource("%d")\n'
+    '\n'
+)
+
+# PANORAMA SKY - Use custom sky_panorama.png texture
+SKY_MATERIAL_TEMPLATE = (
+    '[sub_resource type="PanoramaSkyMaterial" id="%d"]\n'
+    'panorama = ExtResource("sky_panorama")\n'
+    '\n'
+)
+
+# Sky
+SKY_TEMPLATE = (
+    '[sub_resource type="Sky" id="%d"]\n'
+    'sky_material = SubResource("%d")\n'
+    '\n'
+)
+
+# Particle material for falling leaves
+LEAF_PARTICLE_TEMPLATE = (
+    '[sub_resource type="ParticleProcessMaterial" id="%d"]\n'
+    'emission_shape = 3\n'  # Box
+    'emission_box_extents = Vector3(80, 0, 80)\n'
+    'direction = Vector3(0.3, -1, 0.2)\n'
+    'spread = 25.0\n'
+    'gravity = Vector3(0, -0.3, 0)\n'
+    'initial_velocity_min = 0.5\n'
+    'initial_velocity_max = 1.5\n'
+    'angular_velocity_min = -60.0\n'
+    'angular_velocity_max = 60.0\n'
+    'scale_min = 0.08\n'
+    'scale_max = 0.2\n'
+    'color = Color(0.65, 0.5, 0.25, 0.9)\n'
+    '\n'
+)
+
+# Dust mote particle material
+DUST_PARTICLE_TEMPLATE = (
+    '[sub_resource type="ParticleProcessMaterial" id="%d"]\n'
+    'emission_shape = 3\n'
+    'emission_box_extents = Vector3(40, 10, 40)\n'
+    'direction = Vector3(0, 0.2, 0)\n'
+    'spread = 180.0\n'
+    'gravity = Vector3(0, 0.05, 0)\n'
+    'initial_velocity_min = 0.1\n'
+    'initial_velocity_max = 0.3\n'
+    'scale_min = 0.01\n'
+    'scale_max = 0.03\n'
+    'color = Color(1, 1, 0.9, 0.4)\n'
+    '\n'
+)
+
+# Simple quad mesh for particles
+PARTICLE_MESH_TEMPLATE = (
+    '[sub_resource type="QuadMesh" id="%d"]\n'
+    'size = Vector2(1, 1)\n'
+    '\n'
+)
+
+# Collectible material (glowing gem)
+COLLECTIBLE_MATERIAL_TEMPLATE = (
+    '[sub_resource type="StandardMaterial3D" id="%d"]\n'
+    'albedo_color = Color(0.2, 0.8, 0.4, 1)\n'
+    'emission_enabled = true\n'
+    'emission = Color(0.3, 1.0, 0.5, 1)\n'
+    'emission_energy_multiplier = 2.0\n'
+    '\n'
+)
+
+# Collectible mesh (small sphere)
+COLLECTIBLE_MESH_TEMPLATE = (
+    '[sub_resource type="SphereMesh" id="%d"]\n'
+    'radius = 0.3\n'
+    'height = 0.6\n'
+    'material = SubResource("%d")\n'
+    '\n'
+)
+
+# Collectible collision shape
+COLLECTIBLE_SHAPE_TEMPLATE = (
+    '[sub_resource type="SphereShape3D" id="%d"]\n'
+    'radius = 0.5\n'
+    '\n'
+)
+
+# Mountain material
+MOUNTAIN_MATERIAL_TEMPLATE = (
+    '[sub_resource type="StandardMaterial3D" id="%d"]\n'
+    'albedo_texture = ExtResource("mountain_color")\n'
+    'normal_enabled = true\n'
+    'normal_texture = ExtResource("mountain_normal")\n'
+    '\n'
+)
+
+# One grass instance in the MultiMesh buffer: cos*s, sin*s, x, s, -sin*s,
+# cos*s, z. 4 decimals (~0.1 mm) like TRANSFORM3D_TEMPLATE; full repr floats only
+# bloat the file. Origin y is ground level (the shader displaces by terrain).
+GRASS_TRANSFORM_TEMPLATE = "%.4f, 0, %.4f, %.4f, 0, %.4f, 0, 0.0000, %.4f, 0, %.4f, %.4f"
+
+@functools.lru_cache(maxsize=None)
+def graphics_environment_blocks(quality):
+    """
+    Render the Environment lines that depend only on the graphics quality
+    preset. Presets are immutable, so each quality is formatted once and
+    returned as (head, volumetric_fog, tail) text; volumetric_fog is "" when
+    disabled and the caller writes the depth fog fallback instead.
+    """
+    gfx = {**GRAPHICS_DEFAULTS, **GRAPHICS_PRESETS.get(quality, GRAPHICS_ULTRA)}
+    buf = io.StringIO()
+    w = buf.write
+
+    # Tonemapping
+    tonemap_mode = gfx["tonemap_mode"]
+    w(f'tonemap_mode = {tonemap_mode}\n'  # 0=Linear, 2=Reinhard, 3=ACES
+      f'tonemap_exposure = {gfx["tonemap_exposure"]}\n'
+      f'tonemap_white = {gfx["tonemap_white"]}\n')
+
+    # SDFGI - Global Illumination
+    if gfx["sdfgi_enabled"]:
+        w('sdfgi_enabled = true\n'
+          f'sdfgi_cascades = {gfx["sdfgi_cascades"]}\n'
+          f'sdfgi_min_cell_size = {gfx["sdfgi_min_cell_size"]}\n'
+          f'sdfgi_cascade0_distance = {gfx["sdfgi_cascade0_distance"]}\n'
+          f'sdfgi_y_scale = {gfx["sdfgi_y_scale"]}\n'
+          f'sdfgi_energy = {gfx["sdfgi_energy"]}\n'
+          f'sdfgi_normal_bias = {gfx["sdfgi_normal_bias"]}\n'
+          f'sdfgi_probe_bias = {gfx["sdfgi_probe_bias"]}\n'
+          f'sdfgi_bounce_feedback = {gfx["sdfgi_bounce_feedback"]}\n'
+          f'sdfgi_read_sky_light = {str(gfx["sdfgi_read_sky_light"]).lower()}\n'
+          'sdfgi_use_occlusion = true\n')
+
+    # SSR - Screen Space Reflections
+    if gfx["ssr_enabled"]:
+        w('ssr_enabled = true\n'
+          f'ssr_max_steps = {gfx["ssr_max_steps"]}\n'
+          f'ssr_fade_in = {gfx["ssr_fade_in"]}\n'
+          f'ssr_fade_out = {gfx["ssr_fade_out"]}\n'
+          f'ssr_depth_tolerance = {gfx["ssr_depth_tolerance"]}\n')
+
+    # SSAO - Screen Space Ambient Occlusion
+    if gfx["ssao_enabled"]:
+        w('ssao_enabled = true\n'
+          f'ssao_radius = {gfx["ssao_radius"]}\n'
+          f'ssao_intensity = {gfx["ssao_intensity"]}\n'
+          f'ssao_power = {gfx["ssao_power"]}\n'
+          f'ssao_detail = {gfx["ssao_detail"]}\n'
+          f'ssao_horizon = {gfx["ssao_horizon"]}\n'
+          f'ssao_sharpness = {gfx["ssao_sharpness"]}\n'
+          f'ssao_light_affect = {gfx["ssao_light_affect"]}\n'
+          f'ssao_ao_channel_affect = {gfx["ssao_ao_channel_affect"]}\n')
+
+    # SSIL - Screen Space Indirect Lighting
+    if gfx["ssil_enabled"]:
+        w('ssil_enabled = true\n'
+          f'ssil_radius = {gfx["ssil_radius"]}\n'
+          f'ssil_intensity = {gfx["ssil_intensity"]}\n'
+          f'ssil_sharpness = {gfx["ssil_sharpness"]}\n'
+          f'ssil_normal_rejection = {gfx["ssil_normal_rejection"]}\n')
+
+    head = buf.getvalue()
+
+    buf = io.StringIO()
+    w = buf.write
+    # Volumetric Fog (high-end); the depth fog fallback depends on the preset
+    if gfx["volumetric_fog_enabled"]:
+        vf_albedo = gfx["volumetric_fog_albedo"]
+        vf_emission = gfx["volumetric_fog_emission"]
+        w('volumetric_fog_enabled = true\n'
+          f'volumetric_fog_density = {gfx["volumetric_fog_density"]}\n'
+          f'volumetric_fog_albedo = Color({vf_albedo[0]}, {vf_albedo[1]}, {vf_albedo[2]}, 1)\n'
+          f'volumetric_fog_emission = Color({vf_emission[0]}, {vf_emission[1]}, {vf_emission[2]}, 1)\n'
+          f'volumetric_fog_emission_energy = {gfx["volumetric_fog_emission_energy"]}\n'
+          f'volumetric_fog_gi_inject = {gfx["volumetric_fog_gi_inject"]}\n'
+          f'volumetric_fog_anisotropy = {gfx["volumetric_fog_anisotropy"]}\n'
+          f'volumetric_fog_length = {gfx["volumetric_fog_length"]}\n'
+          f'volumetric_fog_detail_spread = {gfx["volumetric_fog_detail_spread"]}\n'
+          f'volumetric_fog_ambient_inject = {gfx["volumetric_fog_ambient_inject"]}\n'
+          f'volumetric_fog_sky_affect = {gfx["volumetric_fog_sky_affect"]}\n')
+        if gfx["volumetric_fog_temporal_reprojection_enabled"]:
+            w('volumetric_fog_temporal_reprojection_enabled = true\n'
+              f'volumetric_fog_temporal_reprojection_amount = {gfx["volumetric_fog_temporal_reprojection_amount"]}\n')
+    volumetric_fog = buf.getvalue()
+
+    buf = io.StringIO()
+    w = buf.write
+    # Glow/Bloom
+    if gfx["glow_enabled"]:
+        w('glow_enabled = true\n'
+          f'glow_normalized = {str(gfx["glow_normalized"]).lower()}\n'
+          f'glow_intensity = {gfx["glow_intensity"]}\n'
+          f'glow_strength = {gfx["glow_strength"]}\n'
+          f'glow_bloom = {gfx["glow_bloom"]}\n'
+          f'glow_blend_mode = {gfx["glow_blend_mode"]}\n'  # 0=Additive, 1=Screen, 2=Softlight, 3=Replace, 4=Mix
+          f'glow_hdr_threshold = {gfx["glow_hdr_threshold"]}\n'
+          f'glow_hdr_scale = {gfx["glow_hdr_scale"]}\n'
+          f'glow_hdr_luminance_cap = {gfx["glow_hdr_luminance_cap"]}\n'
+          f'glow_map_strength = {gfx["glow_map_strength"]}\n')
+        glow_levels = gfx["glow_levels"]
+        w("".join(f'glow_levels/{i + 1} = {float(enabled)}\n' for i, enabled in enumerate(glow_levels)))
+
+    # Color Adjustments
+    if gfx["adjustment_enabled"]:
+        w('adjustment_enabled = true\n'
+          f'adjustment_brightness = {gfx["adjustment_brightness"]}\n'
+          f'adjustment_contrast = {gfx["adjustment_contrast"]}\n'
+          f'adjustment_saturation = {gfx["adjustment_saturation"]}\n')
+
+    # Depth of Field (optional)
+    if gfx["dof_blur_far_enabled"]:
+        w('dof_blur_far_enabled = true\n'
+          f'dof_blur_far_distance = {gfx["dof_blur_far_distance"]}\n'
+          f'dof_blur_far_transition = {gfx["dof_blur_far_transition"]}\n')
+    if gfx["dof_blur_near_enabled"]:
+        w('dof_blur_near_enabled = true\n'
+          f'dof_blur_near_distance = {gfx["dof_blur_near_distance"]}\n'
+          f'dof_blur_near_transition = {gfx["dof_blur_near_transition"]}\n')
+
+    return head, volumetric_fog, buf.getvalue()
+
 def write_environment_resources():
     """
     Generate sub_resource definitions for environment (materials, meshes, sky).
     Uses the active preset for colors, lighting, and features.
-    Returns (lines, resource_ids) where resource_ids maps names to IDs.
+    Returns (text, resource_ids) where resource_ids maps names to IDs.
+    Text is written to one StringIO buffer rather than collected as a line list.
     """
     preset = get_preset()
-    lines = []
+    buf = io.StringIO()
+    w = buf.write
     res_ids = {}
     next_id = 100  # Start at 100 to avoid conflicts with ext_resources
 
@@ -1245,8 +1899,9 @@ def write_environment_resources():
     ground_horizon = preset.get("ground_horizon_color", (0.55, 0.55, 0.5))
     ground_bottom = preset.get("ground_bottom_color", (0.2, 0.17, 0.13))
     ambient_energy = preset.get("ambient_energy", 0.8)
-    # Graphics quality setting overrides preset fog setting
-    gfx = get_graphics_settings()
+    # Graphics quality settings over the shared defaults, so every key below
+    # is a plain subscript; the quality setting overrides preset fog setting
+    gfx = {**GRAPHICS_DEFAULTS, **get_graphics_settings()}
     fog_enabled = gfx.get("fog_enabled", preset.get("fog_enabled", True))
     fog_density = preset.get("fog_density", 0.005)
     fog_color = preset.get("fog_color", (0.9, 0.92, 0.95))
@@ -1255,369 +1910,155 @@ def write_environment_resources():
 
     # Ground noise generator
     res_ids["ground_noise"] = next_id
-    lines.append(f'[sub_resource type="FastNoiseLite" id="{next_id}"]')
-    lines.append('noise_type = 3')  # Cellular
-    lines.append('frequency = 0.05')
-    lines.append('fractal_octaves = 3')
-    lines.append("")
+    w(f'[sub_resource type="FastNoiseLite" id="{next_id}"]\n'
+      'noise_type = 3\n'  # Cellular
+      'frequency = 0.05\n'
+      'fractal_octaves = 3\n'
+      '\n')
     next_id += 1
 
     # Ground noise texture
     res_ids["ground_noise_texture"] = next_id
-    lines.append(f'[sub_resource type="NoiseTexture2D" id="{next_id}"]')
-    lines.append('seamless = true')
-    lines.append('width = 512')
-    lines.append('height = 512')
-    lines.append(f'noise = SubResource("{res_ids["ground_noise"]}")')
-    lines.append("")
+    w(f'[sub_resource type="NoiseTexture2D" id="{next_id}"]\n'
+      'seamless = true\n'
+      'width = 512\n'
+      'height = 512\n'
+      f'noise = SubResource("{res_ids["ground_noise"]}")\n'
+      '\n')
     next_id += 1
 
     # Ground PBR shader material with multi-layer texturing
     res_ids["ground_material"] = next_id
-    lines.append(f'[sub_resource type="ShaderMaterial" id="{next_id}"]')
-    lines.append('shader = ExtResource("terrain_pbr_shader")')
+    w(f'[sub_resource type="ShaderMaterial" id="{next_id}"]\n'
+      'shader = ExtResource("terrain_pbr_shader")\n')
 
     # Heightmap for terrain displacement
-    lines.append('shader_parameter/heightmap = ExtResource("heightmap")')
-    lines.append(f'shader_parameter/height_scale = {terrain_height}')
-    lines.append(f'shader_parameter/terrain_size = {GROUND_SIZE}')
-
-    # Layer 1 - Grass (low areas)
-    lines.append('shader_parameter/albedo_tex_1 = ExtResource("grass_albedo")')
-    lines.append('shader_parameter/normal_tex_1 = ExtResource("grass_normal")')
-    lines.append('shader_parameter/roughness_tex_1 = ExtResource("grass_roughness")')
-    lines.append('shader_parameter/uv_scale_1 = 25.0')
-    lines.append('shader_parameter/height_min_1 = -10.0')
-    lines.append('shader_parameter/height_max_1 = 10.0')
-
-    # Layer 2 - Dirt (mid areas, paths)
-    lines.append('shader_parameter/albedo_tex_2 = ExtResource("dirt_albedo")')
-    lines.append('shader_parameter/normal_tex_2 = ExtResource("dirt_normal")')
-    lines.append('shader_parameter/roughness_tex_2 = ExtResource("dirt_roughness")')
-    lines.append('shader_parameter/uv_scale_2 = 30.0')
-    lines.append('shader_parameter/height_min_2 = 5.0')
-    lines.append('shader_parameter/height_max_2 = 25.0')
-
-    # Layer 3 - Rock (high areas, cliffs)
-    lines.append('shader_parameter/albedo_tex_3 = ExtResource("rock_albedo")')
-    lines.append('shader_parameter/normal_tex_3 = ExtResource("rock_normal")')
-    lines.append('shader_parameter/roughness_tex_3 = ExtResource("rock_roughness")')
-    lines.append('shader_parameter/uv_scale_3 = 20.0')
-    lines.append('shader_parameter/height_min_3 = 20.0')
-    lines.append('shader_parameter/height_max_3 = 50.0')
-
-    # Layer 4 - Snow (peaks)
-    lines.append('shader_parameter/albedo_tex_4 = ExtResource("snow_albedo")')
-    lines.append('shader_parameter/normal_tex_4 = ExtResource("snow_normal")')
-    lines.append('shader_parameter/roughness_tex_4 = ExtResource("snow_roughness")')
-    lines.append('shader_parameter/uv_scale_4 = 35.0')
-    lines.append('shader_parameter/height_min_4 = 40.0')
-    lines.append('shader_parameter/height_max_4 = 100.0')
+    w('shader_parameter/heightmap = ExtResource("heightmap")\n'
+      f'shader_parameter/height_scale = {terrain_height}\n'
+      f'shader_parameter/terrain_size = {GROUND_SIZE}\n')
 
-    # Blending settings
-    lines.append('shader_parameter/blend_sharpness = 2.0')
-    lines.append('shader_parameter/slope_threshold = 0.6')
-    lines.append('shader_parameter/slope_blend = 0.15')
-    lines.append('shader_parameter/use_triplanar = true')
-    lines.append('shader_parameter/triplanar_sharpness = 4.0')
-    lines.append("")
+    w(GROUND_LAYERS_BLOCK)
     next_id += 1
 
     # Ground mesh (PlaneMesh with high subdivision for terrain detail)
     res_ids["ground_mesh"] = next_id
-    lines.append(f'[sub_resource type="PlaneMesh" id="{next_id}"]')
-    lines.append(f'size = Vector2({GROUND_SIZE}, {GROUND_SIZE})')
-    lines.append('subdivide_width = 128')
-    lines.append('subdivide_depth = 128')
-    lines.append(f'material = SubResource("{res_ids["ground_material"]}")')
-    lines.append("")
+    w(f'[sub_resource type="PlaneMesh" id="{next_id}"]\n'
+      f'size = Vector2({GROUND_SIZE}, {GROUND_SIZE})\n'
+      'subdivide_width = 128\n'
+      'subdivide_depth = 128\n'
+      f'material = SubResource("{res_ids["ground_material"]}")\n'
+      '\n')
     next_id += 1
 
     # Ground collision shape (flat plane - WorldBoundaryShape3D)
     res_ids["ground_collision_shape"] = next_id
-    lines.append(f'[sub_resource type="WorldBoundaryShape3D" id="{next_id}"]')
-    lines.append("")
+    w(f'[sub_resource type="WorldBoundaryShape3D" id="{next_id}"]\n'
+      '\n')
     next_id += 1
 
     # Path/trail material (dirt brown)
     res_ids["path_material"] = next_id
-    lines.append(f'[sub_resource type="StandardMaterial3D" id="{next_id}"]')
-    lines.append('albedo_color = Color(0.45, 0.35, 0.25, 1)')
-    lines.append(f'albedo_texture = SubResource("{res_ids["ground_noise_texture"]}")')
-    lines.append('uv1_scale = Vector3(10, 10, 1)')
-    lines.append('roughness = 0.85')
-    lines.append("")
+    w(PATH_MATERIAL_TEMPLATE % (next_id, res_ids["ground_noise_texture"]))
     next_id += 1
 
     # Water material (uses shader)
     res_ids["water_material"] = next_id
-    lines.append(f'[sub_resource type="ShaderMaterial" id="{next_id}"]')
-    lines.append('render_priority = 1')
-    lines.append('shader = ExtResource("water_shader")')
-    lines.append('shader_parameter/water_color = Vector3(0.1, 0.3, 0.5)')
-    lines.append('shader_parameter/foam_color = Vector3(0.8, 0.9, 1.0)')
-    lines.append('shader_parameter/wave_speed = 0.5')
-    lines.append('shader_parameter/wave_height = 0.08')
-    lines.append('shader_parameter/wave_frequency = 2.0')
-    lines.append('shader_parameter/transparency = 0.7')
-    lines.append("")
+    w(WATER_MATERIAL_TEMPLATE % next_id)
     next_id += 1
 
     # Water mesh (circular pond)
     res_ids["water_mesh"] = next_id
-    lines.append(f'[sub_resource type="CylinderMesh" id="{next_id}"]')
-    lines.append('top_radius = 1.0')
-    lines.append('bottom_radius = 1.0')
-    lines.append('height = 0.1')
-    lines.append('radial_segments = 24')
-    lines.append(f'material = SubResource("{res_ids["water_material"]}")')
-    lines.append("")
+    w(WATER_MESH_TEMPLATE % (next_id, res_ids["water_material"]))
     next_id += 1
 
     # PANORAMA SKY - Use custom sky_panorama.png texture
     res_ids["sky_material"] = next_id
-    lines.append(f'[sub_resource type="PanoramaSkyMaterial" id="{next_id}"]')
-    lines.append('panorama = ExtResource("sky_panorama")')
-    lines.append("")
+    w(SKY_MATERIAL_TEMPLATE % next_id)
     next_id += 1
 
     # Sky
     res_ids["sky"] = next_id
-    lines.append(f'[sub_resource type="Sky" id="{next_id}"]')
-    lines.append(f'sky_material = SubResource("{res_ids["sky_material"]}")')
-    lines.append("")
+    w(SKY_TEMPLATE % (next_id, res_ids["sky_material"]))
     next_id += 1
 
     # Environment - configured based on graphics quality
-    gfx = get_graphics_settings()
-
     res_ids["environment"] = next_id
-    lines.append(f'[sub_resource type="Environment" id="{next_id}"]')
-    lines.append('background_mode = 2')  # Sky mode
-    lines.append(f'sky = SubResource("{res_ids["sky"]}")')
+    w(f'[sub_resource type="Environment" id="{next_id}"]\n'
+      'background_mode = 2\n'  # Sky mode
+      f'sky = SubResource("{res_ids["sky"]}")\n')
 
     # Ambient lighting
-    lines.append('ambient_light_source = 2')  # Sky ambient
-    lines.append('ambient_light_color = Color(0.8, 0.85, 1.0, 1)')
-    lines.append(f'ambient_light_energy = {ambient_energy + 0.5}')
-    lines.append('reflected_light_source = 2')  # Sky reflections
-
-    # Tonemapping
-    tonemap_mode = gfx.get("tonemap_mode", 3)
-    lines.append(f'tonemap_mode = {tonemap_mode}')  # 0=Linear, 2=Reinhard, 3=ACES
-    lines.append(f'tonemap_exposure = {gfx.get("tonemap_exposure", 1.0)}')
-    lines.append(f'tonemap_white = {gfx.get("tonemap_white", 1.0)}')
-
-    # SDFGI - Global Illumination
-    if gfx.get("sdfgi_enabled", False):
-        lines.append('sdfgi_enabled = true')
-        lines.append(f'sdfgi_cascades = {gfx.get("sdfgi_cascades", 6)}')
-        lines.append(f'sdfgi_min_cell_size = {gfx.get("sdfgi_min_cell_size", 0.2)}')
-        lines.append(f'sdfgi_cascade0_distance = {gfx.get("sdfgi_cascade0_distance", 12.8)}')
-        lines.append(f'sdfgi_y_scale = {gfx.get("sdfgi_y_scale", 1.0)}')
-        lines.append(f'sdfgi_energy = {gfx.get("sdfgi_energy", 1.0)}')
-        lines.append(f'sdfgi_normal_bias = {gfx.get("sdfgi_normal_bias", 1.1)}')
-        lines.append(f'sdfgi_probe_bias = {gfx.get("sdfgi_probe_bias", 1.1)}')
-        lines.append(f'sdfgi_bounce_feedback = {gfx.get("sdfgi_bounce_feedback", 0.5)}')
-        lines.append(f'sdfgi_read_sky_light = {str(gfx.get("sdfgi_read_sky_light", True)).lower()}')
-        lines.append('sdfgi_use_occlusion = true')
-
-    # SSR - Screen Space Reflections
-    if gfx.get("ssr_enabled", False):
-        lines.append('ssr_enabled = true')
-        lines.append(f'ssr_max_steps = {gfx.get("ssr_max_steps", 64)}')
-        lines.append(f'ssr_fade_in = {gfx.get("ssr_fade_in", 0.15)}')
-        lines.append(f'ssr_fade_out = {gfx.get("ssr_fade_out", 2.0)}')
-        lines.append(f'ssr_depth_tolerance = {gfx.get("ssr_depth_tolerance", 0.2)}')
-
-    # SSAO - Screen Space Ambient Occlusion
-    if gfx.get("ssao_enabled", False):
-        lines.append('ssao_enabled = true')
-        lines.append(f'ssao_radius = {gfx.get("ssao_radius", 1.0)}')
-        lines.append(f'ssao_intensity = {gfx.get("ssao_intensity", 2.0)}')
-        lines.append(f'ssao_power = {gfx.get("ssao_power", 1.5)}')
-        lines.append(f'ssao_detail = {gfx.get("ssao_detail", 0.5)}')
-        lines.append(f'ssao_horizon = {gfx.get("ssao_horizon", 0.06)}')
-        lines.append(f'ssao_sharpness = {gfx.get("ssao_sharpness", 0.98)}')
-        lines.append(f'ssao_light_affect = {gfx.get("ssao_light_affect", 0.0)}')
-        lines.append(f'ssao_ao_channel_affect = {gfx.get("ssao_ao_channel_affect", 0.0)}')
-
-    # SSIL - Screen Space Indirect Lighting
-    if gfx.get("ssil_enabled", False):
-        lines.append('ssil_enabled = true')
-        lines.append(f'ssil_radius = {gfx.get("ssil_radius", 5.0)}')
-        lines.append(f'ssil_intensity = {gfx.get("ssil_intensity", 1.0)}')
-        lines.append(f'ssil_sharpness = {gfx.get("ssil_sharpness", 0.98)}')
-        lines.append(f'ssil_normal_rejection = {gfx.get("ssil_normal_rejection", 1.0)}')
-
-    # Volumetric Fog (high-end) or regular depth fog
-    if gfx.get("volumetric_fog_enabled", False):
-        vf_albedo = gfx.get("volumetric_fog_albedo", (0.9, 0.92, 0.95))
-        vf_emission = gfx.get("volumetric_fog_emission", (0.0, 0.0, 0.0))
-        lines.append('volumetric_fog_enabled = true')
-        lines.append(f'volumetric_fog_density = {gfx.get("volumetric_fog_density", 0.01)}')
-        lines.append(f'volumetric_fog_albedo = Color({vf_albedo[0]}, {vf_albedo[1]}, {vf_albedo[2]}, 1)')
-        lines.append(f'volumetric_fog_emission = Color({vf_emission[0]}, {vf_emission[1]}, {vf_emission[2]}, 1)')
-        lines.append(f'volumetric_fog_emission_energy = {gfx.get("volumetric_fog_emission_energy", 0.0)}')
-        lines.append(f'volumetric_fog_gi_inject = {gfx.get("volumetric_fog_gi_inject", 1.0)}')
-        lines.append(f'volumetric_fog_anisotropy = {gfx.get("volumetric_fog_anisotropy", 0.2)}')
-        lines.append(f'volumetric_fog_length = {gfx.get("volumetric_fog_length", 200.0)}')
-        lines.append(f'volumetric_fog_detail_spread = {gfx.get("volumetric_fog_detail_spread", 2.0)}')
-        lines.append(f'volumetric_fog_ambient_inject = {gfx.get("volumetric_fog_ambient_inject", 0.0)}')
-        lines.append(f'volumetric_fog_sky_affect = {gfx.get("volumetric_fog_sky_affect", 1.0)}')
-        if gfx.get("volumetric_fog_temporal_reprojection_enabled", True):
-            lines.append('volumetric_fog_temporal_reprojection_enabled = true')
-            lines.append(f'volumetric_fog_temporal_reprojection_amount = {gfx.get("volumetric_fog_temporal_reprojection_amount", 0.9)}')
+    w('ambient_light_source = 2\n'  # Sky ambient
+      'ambient_light_color = Color(0.8, 0.85, 1.0, 1)\n'
+      f'ambient_light_energy = {ambient_energy + 0.5}\n'
+      'reflected_light_source = 2\n')  # Sky reflections
+
+    # Tonemapping, GI, screen-space effects, glow, adjustments and DOF come
+    # pre-rendered for the active quality; only the fog fallback uses the preset
+    head, volumetric_fog, tail = graphics_environment_blocks(GRAPHICS_QUALITY.lower())
+    w(head)
+    if volumetric_fog:
+        w(volumetric_fog)
     elif fog_enabled or gfx.get("fog_enabled", False):
         # Regular depth fog fallback
-        lines.append('fog_enabled = true')
-        lines.append('fog_mode = 1')  # Depth fog
-        lines.append(f'fog_light_color = Color({fog_color[0]}, {fog_color[1]}, {fog_color[2]}, 1)')
-        lines.append('fog_sun_scatter = 0.5')
-        lines.append(f'fog_density = {fog_density * 0.5}')
-
-    # Glow/Bloom
-    if gfx.get("glow_enabled", False):
-        lines.append('glow_enabled = true')
-        lines.append(f'glow_normalized = {str(gfx.get("glow_normalized", False)).lower()}')
-        lines.append(f'glow_intensity = {gfx.get("glow_intensity", 0.8)}')
-        lines.append(f'glow_strength = {gfx.get("glow_strength", 1.0)}')
-        lines.append(f'glow_bloom = {gfx.get("glow_bloom", 0.0)}')
-        lines.append(f'glow_blend_mode = {gfx.get("glow_blend_mode", 2)}')  # 0=Additive, 1=Screen, 2=Softlight, 3=Replace, 4=Mix
-        lines.append(f'glow_hdr_threshold = {gfx.get("glow_hdr_threshold", 1.0)}')
-        lines.append(f'glow_hdr_scale = {gfx.get("glow_hdr_scale", 2.0)}')
-        lines.append(f'glow_hdr_luminance_cap = {gfx.get("glow_hdr_luminance_cap", 12.0)}')
-        lines.append(f'glow_map_strength = {gfx.get("glow_map_strength", 0.8)}')
-        glow_levels = gfx.get("glow_levels", [1, 0, 1, 0, 1, 0, 0])
-        for i, enabled in enumerate(glow_levels):
-            lines.append(f'glow_levels/{i + 1} = {float(enabled)}')
-
-    # Color Adjustments
-    if gfx.get("adjustment_enabled", False):
-        lines.append('adjustment_enabled = true')
-        lines.append(f'adjustment_brightness = {gfx.get("adjustment_brightness", 1.0)}')
-        lines.append(f'adjustment_contrast = {gfx.get("adjustment_contrast", 1.05)}')
-        lines.append(f'adjustment_saturation = {gfx.get("adjustment_saturation", 1.1)}')
-
-    # Depth of Field (optional)
-    if gfx.get("dof_blur_far_enabled", False):
-        lines.append('dof_blur_far_enabled = true')
-        lines.append(f'dof_blur_far_distance = {gfx.get("dof_blur_far_distance", 100.0)}')
-        lines.append(f'dof_blur_far_transition = {gfx.get("dof_blur_far_transition", 50.0)}')
-    if gfx.get("dof_blur_near_enabled", False):
-        lines.append('dof_blur_near_enabled = true')
-        lines.append(f'dof_blur_near_distance = {gfx.get("dof_blur_near_distance", 2.0)}')
-        lines.append(f'dof_blur_near_transition = {gfx.get("dof_blur_near_transition", 1.0)}')
-
-    lines.append("")
+        w('fog_enabled = true\n'
+          'fog_mode = 1\n'  # Depth fog
+          f'fog_light_color = Color({fog_color[0]}, {fog_color[1]}, {fog_color[2]}, 1)\n'
+          'fog_sun_scatter = 0.5\n'
+          f'fog_density = {fog_density * 0.5}\n')
+
+    w(tail)
+    w('\n')
     next_id += 1
 
     # Particle material for falling leaves
     res_ids["leaf_particle_material"] = next_id
-    lines.append(f'[sub_resource type="ParticleProcessMaterial" id="{next_id}"]')
-    lines.append('emission_shape = 3')  # Box
-    lines.append('emission_box_extents = Vector3(80, 0, 80)')
-    lines.append('direction = Vector3(0.3, -1, 0.2)')
-    lines.append('spread = 25.0')
-    lines.append('gravity = Vector3(0, -0.3, 0)')
-    lines.append('initial_velocity_min = 0.5')
-    lines.append('initial_velocity_max = 1.5')
-    lines.append('angular_velocity_min = -60.0')
-    lines.append('angular_velocity_max = 60.0')
-    lines.append('scale_min = 0.08')
-    lines.append('scale_max = 0.2')
-    lines.append('color = Color(0.65, 0.5, 0.25, 0.9)')
-    lines.append("")
+    w(LEAF_PARTICLE_TEMPLATE % next_id)
     next_id += 1
 
     # Dust mote particle material
     res_ids["dust_particle_material"] = next_id
-    lines.append(f'[sub_resource type="ParticleProcessMaterial" id="{next_id}"]')
-    lines.append('emission_shape = 3')
-    lines.append('emission_box_extents = Vector3(40, 10, 40)')
-    lines.append('direction = Vector3(0, 0.2, 0)')
-    lines.append('spread = 180.0')
-    lines.append('gravity = Vector3(0, 0.05, 0)')
-    lines.append('initial_velocity_min = 0.1')
-    lines.append('initial_velocity_max = 0.3')
-    lines.append('scale_min = 0.01')
-    lines.append('scale_max = 0.03')
-    lines.append('color = Color(1, 1, 0.9, 0.4)')
-    lines.append("")
+    w(DUST_PARTICLE_TEMPLATE % next_id)
     next_id += 1
 
     # Simple quad mesh for particles
     res_ids["particle_mesh"] = next_id
-    lines.append(f'[sub_resource type="QuadMesh" id="{next_id}"]')
-    lines.append('size = Vector2(1, 1)')
-    lines.append("")
+    w(PARTICLE_MESH_TEMPLATE % next_id)
     next_id += 1
 
     # Collectible material (glowing gem)
     res_ids["collectible_material"] = next_id
-    lines.append(f'[sub_resource type="StandardMaterial3D" id="{next_id}"]')
-    lines.append('albedo_color = Color(0.2, 0.8, 0.4, 1)')
-    lines.append('emission_enabled = true')
-    lines.append('emission = Color(0.3, 1.0, 0.5, 1)')
-    lines.append('emission_energy_multiplier = 2.0')
-    lines.append("")
+    w(COLLECTIBLE_MATERIAL_TEMPLATE % next_id)
     next_id += 1
 
     # Collectible mesh (small sphere)
     res_ids["collectible_mesh"] = next_id
-    lines.append(f'[sub_resource type="SphereMesh" id="{next_id}"]')
-    lines.append('radius = 0.3')
-    lines.append('height = 0.6')
-    lines.append(f'material = SubResource("{res_ids["collectible_material"]}")')
-    lines.append("")
+    w(COLLECTIBLE_MESH_TEMPLATE % (next_id, res_ids["collectible_material"]))
     next_id += 1
 
     # Collectible collision shape
     res_ids["collectible_shape"] = next_id
-    lines.append(f'[sub_resource type="SphereShape3D" id="{next_id}"]')
-    lines.append('radius = 0.5')
-    lines.append("")
+    w(COLLECTIBLE_SHAPE_TEMPLATE % next_id)
     next_id += 1
 
     # Mountain material
     res_ids["mountain_material"] = next_id
-    lines.append(f'[sub_resource type="StandardMaterial3D" id="{next_id}"]')
-    lines.append('albedo_texture = ExtResource("mountain_color")')
-    lines.append('normal_enabled = true')
-    lines.append('normal_texture = ExtResource("mountain_normal")')
-    lines.append("")
+    w(MOUNTAIN_MATERIAL_TEMPLATE % next_id)
     next_id += 1
 
     # Grass MultiMesh material with wind animation
     res_ids["grass_multimesh_material"] = next_id
-    lines.append(f'[sub_resource type="ShaderMaterial" id="{next_id}"]')
-    lines.append('shader = ExtResource("grass_shader")')
-    lines.append('shader_parameter/grass_texture = ExtResource("grass_blade")')
-    lines.append('shader_parameter/grass_color_base = Vector3(0.15, 0.35, 0.1)')
-    lines.append('shader_parameter/grass_color_tip = Vector3(0.35, 0.55, 0.2)')
-    lines.append('shader_parameter/color_variation = 0.08')
-    lines.append('shader_parameter/alpha_scissor = 0.4')
-    lines.append('shader_parameter/wind_strength = 0.4')
-    lines.append('shader_parameter/wind_speed = 1.2')
-    lines.append('shader_parameter/wind_direction = Vector2(1.0, 0.3)')
-    lines.append('shader_parameter/wind_turbulence = 0.25')
-    lines.append('shader_parameter/wind_noise = ExtResource("wind_noise")')
-    lines.append('shader_parameter/wind_noise_scale = 0.08')
-    lines.append('shader_parameter/fade_start = 60.0')
-    lines.append('shader_parameter/fade_end = 100.0')
-    lines.append('shader_parameter/subsurface_strength = 0.4')
-    lines.append('shader_parameter/subsurface_color = Vector3(0.5, 0.75, 0.3)')
-    lines.append("")
+    w(GRASS_MATERIAL_TEMPLATE % next_id)
     next_id += 1
 
     # Grass blade mesh for MultiMesh - use PlaneMesh for proper grass rendering
     res_ids["grass_blade_mesh"] = next_id
-    lines.append(f'[sub_resource type="PlaneMesh" id="{next_id}"]')
-    lines.append('size = Vector2(0.2, 0.6)')  # Width x Height
-    lines.append('orientation = 2')  # Face Z - vertical plane
-    lines.append('center_offset = Vector3(0, 0.3, 0)')  # Pivot at bottom
-    lines.append(f'material = SubResource("{res_ids["grass_multimesh_material"]}")')
-    lines.append("")
+    w(f'[sub_resource type="PlaneMesh" id="{next_id}"]\n'
+      'size = Vector2(0.2, 0.6)\n'  # Width x Height
+      'orientation = 2\n'  # Face Z - vertical plane
+      'center_offset = Vector3(0, 0.3, 0)\n'  # Pivot at bottom
+      f'material = SubResource("{res_ids["grass_multimesh_material"]}")\n'
+      '\n')
     next_id += 1
 
     # MultiMesh for grass instances
@@ -1627,68 +2068,85 @@ def write_environment_resources():
     grass_count = min(grass_count, 50000)  # Reduced cap for faster loading
 
     res_ids["grass_multimesh"] = next_id
-    lines.append(f'[sub_resource type="MultiMesh" id="{next_id}"]')
-    lines.append('transform_format = 1')  # 3D transforms
-    lines.append(f'instance_count = {grass_count}')
-    lines.append(f'mesh = SubResource("{res_ids["grass_blade_mesh"]}")')
+    w(f'[sub_resource type="MultiMesh" id="{next_id}"]\n'
+      'transform_format = 1\n'  # 3D transforms
+      f'instance_count = {grass_count}\n'
+      f'mesh = SubResource("{res_ids["grass_blade_mesh"]}")\n')
 
     # Generate grass transforms using Poisson-like distribution
     rng = random.Random(SEED + 12345)
     transforms = []
+    append = transforms.append
     half_size = grass_area_size / 2
 
-    for i in range(grass_count):
+    # rng.uniform(a, b) is a + (b - a) * rng.random(); inlining it with the
+    # spans precomputed draws the same numbers without a method call each
+    rand = rng.random
+    sincos = sincos_function()
+    tau = math.tau
+    pos_span = 2 * half_size
+    scale_span = 1.3 - 0.7
+    template = GRASS_TRANSFORM_TEMPLATE
+
+    for _ in range(grass_count):
         # Random position in area
-        x = rng.uniform(-half_size, half_size)
-        z = rng.uniform(-half_size, half_size)
-        y = 0.0  # Ground level (shader can displace based on terrain)
+        x = -half_size + pos_span * rand()
+        z = -half_size + pos_span * rand()
 
-        # Random rotation around Y axis
-        rot_y = rng.uniform(0, math.pi * 2)
+        # Random rotation around Y axis (a SINCOS_TABLE step with USE_FAST_TRIG)
+        sy, cy = sincos(tau * rand())
 
         # Random scale variation
-        scale = rng.uniform(0.7, 1.3)
+        scale = 0.7 + scale_span * rand()
 
         # Build transform as 3x4 row-major matrix (Godot MultiMesh buffer format)
         # Format: [basis_xx, basis_xy, basis_xz, origin_x,
         #          basis_yx, basis_yy, basis_yz, origin_y,
         #          basis_zx, basis_zy, basis_zz, origin_z]
-        cy, sy = math.cos(rot_y), math.sin(rot_y)
         # Y rotation matrix rows: [[cos, 0, sin], [0, 1, 0], [-sin, 0, cos]]
-        transforms.append(f"{cy*scale}, 0, {sy*scale}, {x}, 0, {scale}, 0, {y}, {-sy*scale}, 0, {cy*scale}, {z}")
+        cs = cy * scale
+        ss = sy * scale
+        append(template % (cs, ss, x, scale, -ss, cs, z))
 
     # Write transforms as buffer (PackedFloat32Array format)
-    lines.append(f'buffer = PackedFloat32Array({", ".join(transforms)})')
-    lines.append("")
+    w(f'buffer = PackedFloat32Array({", ".join(transforms)})\n')
+    # No trailing blank line: the scene writer's line join supplies it
     next_id += 1
 
-    return lines, res_ids
+    return buf.getvalue(), res_ids
 
 def generate_path_curve_resource(path_pts, res_id):
-    """Generate a Curve3D sub_resource for a Path3D from path points."""
-    lines = []
-    lines.append(f'[sub_resource type="Curve3D" id="{res_id}"]')
-
-    # Sample every Nth point to keep the curve manageable
+    """
+    Generate a Curve3D sub_resource for a Path3D from path points.
+    Returns scene lines; an interior point's position and tangents are one
+    three-line entry.
+    """
+    # Sample every Nth point to keep the curve manageable, always ending on
+    # the last path point
     step = max(1, len(path_pts) // 50)
     sampled = path_pts[::step]
-    if path_pts[-1] not in sampled:
+    if sampled[-1] != path_pts[-1]:
         sampled.append(path_pts[-1])
+    last = len(sampled) - 1
 
-    # Build the point arrays
-    points_str = ", ".join(f"Vector3({p[0]:.2f}, 0.02, {p[1]:.2f})" for p in sampled)
-    lines.append(f'point_count = {len(sampled)}')
-
-    for i, p in enumerate(sampled):
-        lines.append(f'point_{i}/position = Vector3({p[0]:.2f}, 0.02, {p[1]:.2f})')
-        # Add some in/out tangents for smoother curve
-        if i > 0 and i < len(sampled) - 1:
+    lines = [
+        f'[sub_resource type="Curve3D" id="{res_id}"]',
+        f'point_count = {len(sampled)}',
+    ]
+    append = lines.append
+    for i, (x, z) in enumerate(sampled):
+        position = f'point_{i}/position = Vector3({x:.2f}, 0.02, {z:.2f})'
+        if 0 < i < last:
+            # Add some in/out tangents for smoother curve
             dx = sampled[i+1][0] - sampled[i-1][0]
             dz = sampled[i+1][1] - sampled[i-1][1]
-            lines.append(f'point_{i}/in = Vector3({-dx*0.2:.2f}, 0, {-dz*0.2:.2f})')
-            lines.append(f'point_{i}/out = Vector3({dx*0.2:.2f}, 0, {dz*0.2:.2f})')
+            append(f'{position}\n'
+                   f'point_{i}/in = Vector3({-dx*0.2:.2f}, 0, {-dz*0.2:.2f})\n'
+                   f'point_{i}/out = Vector3({dx*0.2:.2f}, 0, {dz*0.2:.2f})')
+        else:
+            append(position)
 
-    lines.append("")
+    append("")
     return lines
 
 def write_path_nodes(path_pts, secondary_paths, env_res_ids):
@@ -1734,24 +2192,49 @@ def write_path_nodes(path_pts, secondary_paths, env_res_ids):
 # -------------------------
 
 def generate_control_points(length, num_points, wander):
-    points = [(0.0, 0.0)]
     step = length / (num_points - 1)
-    for _ in range(1, num_points):
-        px, pz = points[-1]
-        points.append((px + random.uniform(-wander, wander), pz + step))
+    # All lateral offsets in one batch; -wander + span * random() is exactly
+    # what RNG.uniform(-wander, wander) computes, so the path is unchanged
+    rand = RNG.random
+    span = wander - -wander
+    offsets = [-wander + span * rand() for _ in range(1, num_points)]
+    points = [(0.0, 0.0)]
+    px = pz = 0.0
+    for offset in offsets:
+        px += offset
+        pz += step
+        points.append((px, pz))
     return points
 
-def catmull_rom(p0, p1, p2, p3, t):
-    def cr1d(a, b, c, d, t):
-        return 0.5 * ((2*b) + (-a+c)*t + (2*a-5*b+4*c-d)*t*t + (-a+3*b-3*c+d)*t**3)
-    return (cr1d(p0[0],p1[0],p2[0],p3[0],t), cr1d(p0[1],p1[1],p2[1],p3[1],t))
+# Catmull-Rom basis: P(t) = [1, t, t^2, t^3] . CATMULL_ROM_BASIS . [p0, p1, p2, p3]
+CATMULL_ROM_BASIS = (
+    ( 0.0,  1.0,  0.0,  0.0),
+    (-0.5,  0.0,  0.5,  0.0),
+    ( 1.0, -2.5,  2.0, -0.5),
+    (-0.5,  1.5, -1.5,  0.5),
+)
+
+def catmull_rom_weights(t):
+    """Blend weights (w0, w1, w2, w3) applied to the four control points at parameter t."""
+    powers = (1.0, t, t * t, t * t * t)
+    return tuple(sum(powers[k] * CATMULL_ROM_BASIS[k][j] for k in range(4)) for j in range(4))
+
+@functools.lru_cache(maxsize=None)
+def catmull_rom_weight_table(samples):
+    """catmull_rom_weights for t = s / samples, s in range(samples); shared by every path."""
+    return tuple(catmull_rom_weights(s / samples) for s in range(samples))
 
 def sample_path(ctrl_pts, samples=20):
     ext = [ctrl_pts[0]] + ctrl_pts + [ctrl_pts[-1]]
+    # The blend weights depend only on t, so they are shared by all segments
+    # (and all paths); each segment is then one comprehension over the table
+    weights = catmull_rom_weight_table(samples)
     pts = []
+    extend = pts.extend
     for i in range(1, len(ext)-2):
-        for s in range(samples):
-            pts.append(catmull_rom(ext[i-1], ext[i], ext[i+1], ext[i+2], s/samples))
+        (x0, z0), (x1, z1), (x2, z2), (x3, z3) = ext[i-1], ext[i], ext[i+1], ext[i+2]
+        extend([(w0*x0 + w1*x1 + w2*x2 + w3*x3, w0*z0 + w1*z1 + w2*z2 + w3*z3)
+                for w0, w1, w2, w3 in weights])
     pts.append(ctrl_pts[-1])
     return pts
 
@@ -1769,24 +2252,38 @@ def perp(t):
 # TERRAIN HEIGHT FUNCTIONS (Enhanced from C# Noise.cs and MapGenerator.cs)
 # -------------------------
 
-# Cache for terrain noise values (cleared at start of each generation)
-_terrain_noise_cache = {}
+# Caches for terrain heights (cleared at start of each generation)
 _heightmap_cache = {}
+_heightmap = None  # (x_min, z_min, cell_size, cols, rows, heights) from build_heightmap
 
 def clear_terrain_cache():
-    """Clear the terrain noise cache."""
-    global _terrain_noise_cache, _heightmap_cache
-    _terrain_noise_cache = {}
+    """Clear the terrain height caches."""
+    global _heightmap_cache, _heightmap
     _heightmap_cache = {}
+    _heightmap = None
+    _path_index_cache.clear()
 
 def _get_noise_value(ix, iz, seed_offset=0):
-    """Get a deterministic noise value for integer grid coordinates."""
-    key = (ix, iz, seed_offset)
-    if key not in _terrain_noise_cache:
-        # Use deterministic random based on coordinates (like C# FastNoiseLite)
-        r = random.Random(hash((ix, iz, SEED + seed_offset)) & 0x7FFFFFFF)
-        _terrain_noise_cache[key] = r.random() * 2.0 - 1.0
-    return _terrain_noise_cache[key]
+    """Get a deterministic noise value in [-1, 1) for integer grid coordinates.
+
+    Stateless integer hash of the lattice point (murmur-style multiply/xor
+    mix), so no per-sample RNG object or lookup cache is needed.
+    """
+    k = (ix * 374761393 + iz * 668265263 + (SEED + seed_offset) * 2147483647) & 0xFFFFFFFF
+    k = (k ^ (k >> 13)) * 1274126177 & 0xFFFFFFFF
+    k ^= k >> 16
+    return k / 2147483648.0 - 1.0
+
+def _noise_row(x_lo, x_hi, iz, seed_offset=0):
+    """_get_noise_value for ix in x_lo..x_hi at one iz, hashed in a single loop."""
+    k = (x_lo * 374761393 + iz * 668265263 + (SEED + seed_offset) * 2147483647) & 0xFFFFFFFF
+    row = []
+    append = row.append
+    for _ in range(x_hi - x_lo + 1):
+        m = (k ^ (k >> 13)) * 1274126177 & 0xFFFFFFFF
+        append((m ^ (m >> 16)) / 2147483648.0 - 1.0)
+        k = (k + 374761393) & 0xFFFFFFFF
+    return row
 
 def _smooth_noise(x, z, seed_offset=0):
     """Smoothed noise using bilinear interpolation (from C# Noise.cs)."""
@@ -1812,13 +2309,38 @@ def _simplex_noise_pass(x, z, octaves, frequency, seed_offset=0):
     Generate noise for a single pass, mimicking C# GenerateHeightMapSimplex.
     Uses FBM (Fractal Brownian Motion) with configurable octaves and frequency.
     """
+    # _smooth_noise and the lattice hash are inlined below (same arithmetic,
+    # same order) so each octave is one straight-line block of integer math
+    floor = math.floor
     value = 0.0
     amplitude = 1.0
     freq = frequency
     total_amp = 0.0
 
     for i in range(octaves):
-        value += _smooth_noise(x * freq, z * freq, seed_offset + i) * amplitude
+        nx, nz = x * freq, z * freq
+        offset = seed_offset + i
+        x0, z0 = int(floor(nx)), int(floor(nz))
+        fx, fz = nx - x0, nz - z0
+        fx = fx * fx * (3 - 2 * fx)
+        fz = fz * fz * (3 - 2 * fz)
+
+        k = (x0 * 374761393 + z0 * 668265263 + (SEED + offset) * 2147483647) & 0xFFFFFFFF
+        m = (k ^ (k >> 13)) * 1274126177 & 0xFFFFFFFF
+        n00 = (m ^ (m >> 16)) / 2147483648.0 - 1.0
+        k = (k + 374761393) & 0xFFFFFFFF
+        m = (k ^ (k >> 13)) * 1274126177 & 0xFFFFFFFF
+        n10 = (m ^ (m >> 16)) / 2147483648.0 - 1.0
+        k = (k + 668265263) & 0xFFFFFFFF
+        m = (k ^ (k >> 13)) * 1274126177 & 0xFFFFFFFF
+        n11 = (m ^ (m >> 16)) / 2147483648.0 - 1.0
+        k = (k - 374761393) & 0xFFFFFFFF
+        m = (k ^ (k >> 13)) * 1274126177 & 0xFFFFFFFF
+        n01 = (m ^ (m >> 16)) / 2147483648.0 - 1.0
+
+        nx0 = n00 * (1 - fx) + n10 * fx
+        nx1 = n01 * (1 - fx) + n11 * fx
+        value += (nx0 * (1 - fz) + nx1 * fz) * amplitude
         total_amp += amplitude
         amplitude *= 0.5  # Lacunarity for amplitude
         freq *= 2.0       # Lacunarity for frequency
@@ -1833,76 +2355,172 @@ def _apply_contrast(value, contrast, mid=0.0):
     delta = value - mid
     return mid + delta * contrast
 
-def _blend_passes(base_value, add_value, blend_type, blend_weight=1.0):
-    """
-    Blend two terrain passes together.
-    From C# MapGenerator.ApplyBlend.
-
-    Blend types:
-    - "base": Use as base layer
-    - "add": Add to base
-    - "subtract": Subtract from base
-    - "mix": Linear interpolation
-    """
-    if blend_type == "base":
-        return base_value
-    elif blend_type == "add":
-        return base_value + max(0.0, add_value) * blend_weight
-    elif blend_type == "subtract":
-        return base_value - max(0.0, add_value) * blend_weight
-    elif blend_type == "mix":
-        return base_value * (1.0 - blend_weight) + add_value * blend_weight
-    else:
-        return base_value
+def _blend_add(base_value, add_value, blend_weight=1.0):
+    return base_value + max(0.0, add_value) * blend_weight
 
-def get_terrain_height(x, z, path_pts=None):
+def _blend_subtract(base_value, add_value, blend_weight=1.0):
+    return base_value - max(0.0, add_value) * blend_weight
+
+def _blend_mix(base_value, add_value, blend_weight=1.0):
+    return base_value * (1.0 - blend_weight) + add_value * blend_weight
+
+# Terrain pass blending, from C# MapGenerator.ApplyBlend: "add" adds to the
+# base, "subtract" subtracts from it and "mix" interpolates linearly;
+# "base" (and unknown types) keep the height
+_BLEND_FUNCS = {"add": _blend_add, "subtract": _blend_subtract, "mix": _blend_mix}
+
+def _compile_terrain_passes(passes):
     """
-    Get terrain height at world position (x, z).
-    ENHANCED with multi-pass noise blending from C# MapGenerator.
+    Resolve TERRAIN_PASSES defaults and blend dispatch once. Returns a tuple
+    of (seed_offset, octaves, frequency, scale, contrast, blend) for the
+    passes that change the height, so the per-sample loops do no dict
+    lookups or string compares.
     """
-    # Check cache first
-    cache_key = (round(x * 10), round(z * 10))  # Cache with 0.1 unit precision
-    if cache_key in _heightmap_cache:
-        cached_height = _heightmap_cache[cache_key]
-        # Still apply path flattening to cached values
-        if path_pts:
-            cached_height = _apply_path_flattening(cached_height, x, z, path_pts)
-        return cached_height
-
+    compiled = []
+    for pass_idx, terrain_pass in enumerate(passes):
+        blend = _BLEND_FUNCS.get(terrain_pass.get("blend", "base"))
+        if blend is None:
+            continue
+        compiled.append((
+            pass_idx * 100,
+            terrain_pass.get("octaves", TERRAIN_OCTAVES),
+            terrain_pass.get("frequency", TERRAIN_FREQUENCY),
+            terrain_pass.get("scale", 1.0),
+            terrain_pass.get("contrast", 1.0),
+            blend,
+        ))
+    return tuple(compiled)
+
+COMPILED_TERRAIN_PASSES = _compile_terrain_passes(TERRAIN_PASSES)
+
+def _raw_terrain_height(x, z):
+    """Multi-pass noise height at (x, z), before path flattening."""
+    if not TERRAIN_HEIGHT_SCALE:
+        return 0.0  # Flat terrain: every pass would be scaled to zero
     height = 0.0
+    nx = x * TERRAIN_NOISE_SCALE
+    nz = z * TERRAIN_NOISE_SCALE
 
-    # Multi-pass terrain generation (from C# MapGenerator)
-    for pass_idx, terrain_pass in enumerate(TERRAIN_PASSES):
-        octaves = terrain_pass.get("octaves", TERRAIN_OCTAVES)
-        frequency = terrain_pass.get("frequency", TERRAIN_FREQUENCY)
-        scale = terrain_pass.get("scale", 1.0)
-        blend_type = terrain_pass.get("blend", "base")
-        contrast = terrain_pass.get("contrast", 1.0)
-
-        # Generate noise for this pass
-        pass_value = _simplex_noise_pass(
-            x * TERRAIN_NOISE_SCALE,
-            z * TERRAIN_NOISE_SCALE,
-            octaves,
-            frequency,
-            seed_offset=pass_idx * 100
-        )
-
-        # Apply contrast
-        pass_value = _apply_contrast(pass_value, contrast)
+    # Multi-pass terrain generation (from C# MapGenerator): noise, contrast,
+    # scale, then blend with the previous passes
+    for seed_offset, octaves, frequency, scale, contrast, blend in COMPILED_TERRAIN_PASSES:
+        pass_value = _simplex_noise_pass(nx, nz, octaves, frequency, seed_offset)
+        height = blend(height, _apply_contrast(pass_value, contrast) * scale)
 
-        # Scale the pass
-        pass_value *= scale
+    # Normalize from [-1, 1] to [0, 1] and apply height scale
+    return (height + 1) * (0.5 * TERRAIN_HEIGHT_SCALE)
 
-        # Blend with previous passes
-        height = _blend_passes(height, pass_value, blend_type)
+def build_heightmap(x_min, x_max, z_min, z_max, cell_size=HEIGHTMAP_CELL_SIZE):
+    """
+    Precompute raw terrain heights on a regular grid covering the given bounds.
+    get_terrain_height interpolates this grid for points inside it instead of
+    evaluating every noise octave per query. The finest noise features are
+    ~15 units wide, so a 2 unit grid interpolates them smoothly.
+
+    The grid is filled a row at a time: each octave's lattice column and
+    smoothstep weight depend only on x, so they are computed once per column,
+    and the lattice values along a row are fetched once per row. The
+    arithmetic matches _raw_terrain_height exactly.
+    """
+    global _heightmap
+    cols = int(math.ceil((x_max - x_min) / cell_size)) + 1
+    rows = int(math.ceil((z_max - z_min) / cell_size)) + 1
+    if not TERRAIN_HEIGHT_SCALE:
+        # Flat terrain (the default): skip the noise passes entirely
+        _heightmap = (x_min, z_min, cell_size, cols, rows, array.array("d", bytes(8 * cols * rows)))
+        return
+    xs = [x_min + col * cell_size for col in range(cols)]
+    floor = math.floor
+    noise_row = _noise_row
+
+    # Per pass: its octave layers (column tables) and blend settings
+    passes = []
+    for seed_offset, octaves, frequency, scale, contrast, blend in COMPILED_TERRAIN_PASSES:
+        layers = []
+        amplitude = 1.0
+        freq = frequency
+        total_amp = 0.0
+        for i in range(octaves):
+            x0s = []
+            fxs = []
+            for x in xs:
+                nx = x * TERRAIN_NOISE_SCALE * freq
+                x0 = int(floor(nx))
+                fx = nx - x0
+                x0s.append(x0)
+                fxs.append(fx * fx * (3 - 2 * fx))
+            x_lo = min(x0s)
+            layers.append((seed_offset + i, freq, amplitude, x_lo, max(x0s) + 1,
+                           [x0 - x_lo for x0 in x0s], fxs, [1 - fx for fx in fxs]))
+            total_amp += amplitude
+            amplitude *= 0.5
+            freq *= 2.0
+        passes.append((layers, total_amp, scale, blend, contrast))
+
+    half_height = 0.5 * TERRAIN_HEIGHT_SCALE
+    heights = array.array("d")
+    for row in range(rows):
+        nz_base = (z_min + row * cell_size) * TERRAIN_NOISE_SCALE
+        height = [0.0] * cols
+        for layers, total_amp, scale, blend, contrast in passes:
+            value = [0.0] * cols
+            for offset, freq, amplitude, x_lo, x_hi, ks, fxs, gxs in layers:
+                nz = nz_base * freq
+                z0 = int(floor(nz))
+                fz = nz - z0
+                fz = fz * fz * (3 - 2 * fz)
+                gz = 1 - fz
+                near = noise_row(x_lo, x_hi, z0, offset)
+                far = noise_row(x_lo, x_hi, z0 + 1, offset)
+                value = [
+                    v + ((near[k] * gx + near[k + 1] * fx) * gz
+                         + (far[k] * gx + far[k + 1] * fx) * fz) * amplitude
+                    for v, k, fx, gx in zip(value, ks, fxs, gxs)
+                ]
+            pass_values = [
+                _apply_contrast(v / total_amp if total_amp > 0 else 0.0, contrast) * scale
+                for v in value
+            ]
+            height = [blend(h, p) for h, p in zip(height, pass_values)]
+        heights.extend([(h + 1) * half_height for h in height])
+    _heightmap = (x_min, z_min, cell_size, cols, rows, heights)
+
+def _sample_heightmap(x, z):
+    """Bilinear lookup in the precomputed heightmap; None if (x, z) is outside it."""
+    x_min, z_min, cell_size, cols, rows, heights = _heightmap
+    gx = (x - x_min) / cell_size
+    gz = (z - z_min) / cell_size
+    if gx < 0.0 or gz < 0.0:
+        return None
+    ix = int(gx)
+    iz = int(gz)
+    if ix >= cols - 1 or iz >= rows - 1:
+        return None
+    fx = gx - ix
+    fz = gz - iz
+    i = iz * cols + ix
+    h00, h10 = heights[i], heights[i + 1]
+    h01, h11 = heights[i + cols], heights[i + cols + 1]
+    near = h00 + (h10 - h00) * fx
+    far = h01 + (h11 - h01) * fx
+    return near + (far - near) * fz
 
-    # Normalize to [0, 1] and apply height scale
-    height = (height + 1) * 0.5  # Normalize from [-1, 1] to [0, 1]
-    height *= TERRAIN_HEIGHT_SCALE
+def get_terrain_height(x, z, path_pts=None):
+    """
+    Get terrain height at world position (x, z).
+    ENHANCED with multi-pass noise blending from C# MapGenerator.
+    Uses the precomputed heightmap when one covers (x, z).
+    """
+    height = _sample_heightmap(x, z) if _heightmap is not None else None
 
-    # Cache the result (before path flattening)
-    _heightmap_cache[cache_key] = height
+    if height is None:
+        # Check cache first
+        cache_key = (round(x * 10), round(z * 10))  # Cache with 0.1 unit precision
+        height = _heightmap_cache.get(cache_key)
+        if height is None:
+            height = _raw_terrain_height(x, z)
+            # Cache the result (before path flattening)
+            _heightmap_cache[cache_key] = height
 
     # Flatten terrain near paths
     if path_pts:
@@ -1910,18 +2528,77 @@ def get_terrain_height(x, z, path_pts=None):
 
     return height
 
+def get_terrain_heights(points, path_pts=None):
+    """Terrain heights for a batch of (x, z) points, in order, as an array('d')."""
+    height_at = get_terrain_height
+    return array.array("d", [height_at(x, z, path_pts) for x, z in points])
+
+class PathIndex:
+    """
+    Uniform grid over path sample points for nearest-point queries.
+    Only cells within max_dist of the query are visited, so lookups near a
+    long path cost a handful of distance tests instead of one per sample.
+    """
+    __slots__ = ("points", "cell_size", "cells")
+
+    def __init__(self, points, cell_size):
+        self.points = points
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        for i, (px, pz) in enumerate(points):
+            key = (math.floor(px / self.cell_size), math.floor(pz / self.cell_size))
+            self.cells.setdefault(key, []).append(i)
+
+    def nearest(self, x, z, max_dist):
+        """
+        Return (dist_sq, index) of the closest point no further than max_dist,
+        or None. Ties resolve to the lowest index, like a linear scan.
+        """
+        cell_size = self.cell_size
+        span = max(1, math.ceil(max_dist / cell_size))
+        cx = math.floor(x / cell_size)
+        cz = math.floor(z / cell_size)
+        points = self.points
+        cells = self.cells
+        best_sq = max_dist * max_dist
+        best_idx = -1
+        for ix in range(cx - span, cx + span + 1):
+            for iz in range(cz - span, cz + span + 1):
+                bucket = cells.get((ix, iz))
+                if bucket is None:
+                    continue
+                for i in bucket:
+                    px, pz = points[i]
+                    d_sq = (x - px) ** 2 + (z - pz) ** 2
+                    if d_sq < best_sq or (d_sq == best_sq and best_idx >= 0 and i < best_idx):
+                        best_sq = d_sq
+                        best_idx = i
+        if best_idx < 0:
+            return None
+        return best_sq, best_idx
+
+_path_index_cache = {}
+
+def get_path_index(path_pts, cell_size):
+    """Return a PathIndex for path_pts, reusing one built earlier for the same list."""
+    key = (id(path_pts), cell_size)
+    cached = _path_index_cache.get(key)
+    if cached is None or cached.points is not path_pts:
+        cached = _path_index_cache[key] = PathIndex(path_pts, cell_size)
+    return cached
+
 def _apply_path_flattening(height, x, z, path_pts):
     """Apply path flattening to terrain height."""
-    min_dist_sq = float('inf')
-    for px, pz in path_pts:
-        d_sq = (x - px) ** 2 + (z - pz) ** 2
-        if d_sq < min_dist_sq:
-            min_dist_sq = d_sq
-
-    min_dist = math.sqrt(min_dist_sq)
-    if min_dist < PATH_FLATTEN_RADIUS * 2:
+    flatten_dist = PATH_FLATTEN_RADIUS * 2
+    # Only path samples within flatten_dist can change the height
+    hit = get_path_index(path_pts, flatten_dist).nearest(x, z, flatten_dist)
+    if hit is None:
+        return height
+
+    min_dist = math.sqrt(hit[0])
+    if min_dist < flatten_dist:
         # Smoothly blend to flat near path (smoothstep)
-        blend = min(1.0, min_dist / (PATH_FLATTEN_RADIUS * 2))
+        blend = min(1.0, min_dist / flatten_dist)
         blend = blend * blend * (3 - 2 * blend)
         height *= blend
 
@@ -1931,6 +2608,12 @@ def _apply_path_flattening(height, x, z, path_pts):
 # POISSON DISC SAMPLING (from C# PoissonDisc.cs)
 # -------------------------
 
+# Columns of the 5x5 cell window searched around a Poisson candidate, as
+# (column offset, row reach). With cells radius / sqrt(2) wide, points in
+# the four corner cells are always more than radius away (> 1 cell apart
+# on both axes), so the outer columns only reach one row each way.
+POISSON_NEIGHBOUR_COLUMNS = ((-2, 1), (-1, 2), (0, 2), (1, 2), (2, 1))
+
 def poisson_disc_sampling(width, height, radius, samples=30, seed=None):
     """
     Generate evenly distributed points using Poisson Disc Sampling.
@@ -1955,8 +2638,9 @@ def poisson_disc_sampling(width, height, radius, samples=30, seed=None):
     grid_width = math.ceil(width / cell_size)
     grid_height = math.ceil(height / cell_size)
 
-    # Grid stores index+1 of point in that cell (0 means empty)
-    grid = [[0] * grid_height for _ in range(grid_width)]
+    # Flat row-major grid (cell (cx, cy) at cx * grid_height + cy) storing
+    # index+1 of the point in that cell (0 means empty)
+    grid = [0] * (grid_width * grid_height)
     points = []
     spawn_points = []
 
@@ -1964,26 +2648,64 @@ def poisson_disc_sampling(width, height, radius, samples=30, seed=None):
     start_point = (width / 2, height / 2)
     spawn_points.append(start_point)
 
+    # Hot loop: the neighbour test is inlined and everything it touches is
+    # bound to locals, since per-candidate call overhead dominated the runtime.
+    radius_sq = radius * radius
+    max_cell_x = grid_width - 1
+    max_cell_y = grid_height - 1
+    sin = math.sin
+    cos = math.cos
+    tau = math.pi * 2
+    randint = rng.randint
+    rand = rng.random
+    # uniform(radius, 2 * radius) is radius + (2 * radius - radius) * random(),
+    # and 2 * radius - radius == radius exactly
+    dist_min = radius
+    dist_span = radius * 2 - radius
+
     while spawn_points:
-        spawn_index = rng.randint(0, len(spawn_points) - 1)
-        spawn_center = spawn_points[spawn_index]
+        spawn_index = randint(0, len(spawn_points) - 1)
+        spawn_x, spawn_y = spawn_points[spawn_index]
         candidate_accepted = False
 
         for _ in range(samples):
-            angle = rng.random() * math.pi * 2
-            direction = (math.sin(angle), math.cos(angle))
-            dist = rng.uniform(radius, radius * 2)
-            candidate = (
-                spawn_center[0] + direction[0] * dist,
-                spawn_center[1] + direction[1] * dist
-            )
+            angle = rand() * tau
+            dist = dist_min + dist_span * rand()
+            x = spawn_x + sin(angle) * dist
+            y = spawn_y + cos(angle) * dist
 
-            if _is_valid_point(candidate, width, height, cell_size, radius, points, grid):
+            # Check bounds
+            if x < 0 or x >= width or y < 0 or y >= height:
+                continue
+
+            cell_x = int(x / cell_size)
+            cell_y = int(y / cell_size)
+
+            # Search neighboring cells for a point closer than radius
+            valid = True
+            for dx_cells, reach in POISSON_NEIGHBOUR_COLUMNS:
+                sx = cell_x + dx_cells
+                if sx < 0 or sx > max_cell_x:
+                    continue
+                row = sx * grid_height
+                y_start = max(0, cell_y - reach)
+                y_end = min(cell_y + reach, max_cell_y) + 1
+                for point_index in grid[row + y_start:row + y_end]:
+                    if point_index:
+                        other_x, other_y = points[point_index - 1]
+                        dx = x - other_x
+                        dy = y - other_y
+                        if dx * dx + dy * dy < radius_sq:
+                            valid = False
+                            break
+                if not valid:
+                    break
+
+            if valid:
+                candidate = (x, y)
                 points.append(candidate)
                 spawn_points.append(candidate)
-                cell_x = int(candidate[0] / cell_size)
-                cell_y = int(candidate[1] / cell_size)
-                grid[cell_x][cell_y] = len(points)
+                grid[cell_x * grid_height + cell_y] = len(points)
                 candidate_accepted = True
                 break
 
@@ -1993,39 +2715,6 @@ def poisson_disc_sampling(width, height, radius, samples=30, seed=None):
     return points
 
 
-def _is_valid_point(candidate, width, height, cell_size, radius, points, grid):
-    """Check if a candidate point is valid (within bounds and not too close to others)."""
-    x, y = candidate
-
-    # Check bounds
-    if x < 0 or x >= width or y < 0 or y >= height:
-        return False
-
-    cell_x = int(x / cell_size)
-    cell_y = int(y / cell_size)
-
-    # Search neighboring cells
-    search_start_x = max(0, cell_x - 2)
-    search_end_x = min(cell_x + 2, len(grid) - 1)
-    search_start_y = max(0, cell_y - 2)
-    search_end_y = min(cell_y + 2, len(grid[0]) - 1)
-
-    radius_sq = radius * radius
-
-    for sx in range(search_start_x, search_end_x + 1):
-        for sy in range(search_start_y, search_end_y + 1):
-            point_index = grid[sx][sy] - 1
-            if point_index >= 0:
-                other = points[point_index]
-                dx = candidate[0] - other[0]
-                dy = candidate[1] - other[1]
-                sqr_dist = dx * dx + dy * dy
-                if sqr_dist < radius_sq:
-                    return False
-
-    return True
-
-
 def generate_poisson_points_in_area(x_min, x_max, z_min, z_max, radius, seed=None):
     """
     Generate Poisson disc sampled points within a rectangular area.
@@ -2055,13 +2744,42 @@ def generate_poisson_points_in_area(x_min, x_max, z_min, z_max, radius, seed=Non
 # ROTATION MATRICES (enhanced from C# WorldItemSettings)
 # -------------------------
 
+# (sin, cos) at TRIG_TABLE_SIZE evenly spaced angles: the one lookup table for
+# object and grass blade rotations, used when USE_FAST_TRIG is on
+TRIG_TABLE_SIZE = 4096
+_TRIG_SCALE = TRIG_TABLE_SIZE / math.tau
+SINCOS_TABLE = tuple(
+    (math.sin(math.tau * i / TRIG_TABLE_SIZE), math.cos(math.tau * i / TRIG_TABLE_SIZE))
+    for i in range(TRIG_TABLE_SIZE)
+)
+
+def _fast_sincos(a):
+    """(sin(a), cos(a)) at the nearest table angle; a must be above -2*pi."""
+    # Shifting by a full turn keeps the value positive, so int() rounds
+    # to nearest; the mask wraps it back into the table
+    return SINCOS_TABLE[int(a * _TRIG_SCALE + (TRIG_TABLE_SIZE + 0.5)) & (TRIG_TABLE_SIZE - 1)]
+
+def _exact_sincos(a):
+    """(sin(a), cos(a)) from math."""
+    return math.sin(a), math.cos(a)
+
+def sincos_function():
+    """The (sin, cos) helper selected by USE_FAST_TRIG, for hoisting into loops."""
+    return _fast_sincos if USE_FAST_TRIG else _exact_sincos
+
+def _sincos(a):
+    """(sin(a), cos(a)), from the lookup table when USE_FAST_TRIG is on."""
+    return sincos_function()(a)
+
 def y_rot_matrix():
     """Generate a random Y-axis rotation matrix."""
-    a = random.uniform(0, math.tau)
-    c, s = math.cos(a), math.sin(a)
+    a = RNG.uniform(0, math.tau)
+    s, c = _sincos(a)
     return (c, 0.0, -s,  0.0, 1.0, 0.0,  s, 0.0, c)
 
 
+IDENTITY_ROTATION = (1.0, 0.0, 0.0,  0.0, 1.0, 0.0,  0.0, 0.0, 1.0)
+
 def rotation_matrix_with_tilt(y_rotation=None, tilt_x=0.0, tilt_z=0.0):
     """
     Generate a rotation matrix with Y rotation and optional X/Z tilt.
@@ -2076,29 +2794,45 @@ def rotation_matrix_with_tilt(y_rotation=None, tilt_x=0.0, tilt_z=0.0):
         9-tuple representing a 3x3 rotation matrix (row-major)
     """
     if y_rotation is None:
-        y_rotation = random.uniform(0, math.tau)
+        y_rotation = RNG.uniform(0, math.tau)
 
     # Build rotation matrices
-    cy, sy = math.cos(y_rotation), math.sin(y_rotation)
-    cx, sx = math.cos(tilt_x), math.sin(tilt_x)
-    cz, sz = math.cos(tilt_z), math.sin(tilt_z)
+    sincos = sincos_function()
+    sy, cy = sincos(y_rotation)
+    sx, cx = sincos(tilt_x)
+    sz, cz = sincos(tilt_z)
 
     # Combined rotation: Rz * Rx * Ry
-    # This matches the typical Godot rotation order
-    m00 = cy * cz - sy * sx * sz
-    m01 = -cx * sz
-    m02 = sy * cz + cy * sx * sz
+    # This matches the typical Godot rotation order.
+    # sy*sx and cy*sx appear twice each; compute them once (same rounding).
+    sysx = sy * sx
+    cysx = cy * sx
+    return (
+        cy * cz - sysx * sz, -cx * sz, sy * cz + cysx * sz,
+        cy * sz + sysx * cz, cx * cz, sy * sz - cysx * cz,
+        -sy * cx,            sx,      cy * cx,
+    )
 
-    m10 = cy * sz + sy * sx * cz
-    m11 = cx * cz
-    m12 = sy * sz - cy * sx * cz
 
-    m20 = -sy * cx
-    m21 = sx
-    m22 = cy * cx
+def random_object_rotation(randomize_y, max_tilt):
+    """
+    Random rotation matrix from already-resolved asset settings.
+    Same draws as generate_object_rotation, without the per-call attribute lookups.
+    """
+    # Random Y rotation (from WorldItemSettings.RandomizeYRotation)
+    y_rotation = RNG.uniform(0, math.tau) if randomize_y else 0.0
 
-    return (m00, m01, m02, m10, m11, m12, m20, m21, m22)
+    # Random tilt (from WorldItemSettings.RandomizeTiltAngle)
+    if max_tilt > 0:
+        tilt_x = math.radians(RNG.uniform(-max_tilt, max_tilt))
+        tilt_z = math.radians(RNG.uniform(-max_tilt, max_tilt))
+        return rotation_matrix_with_tilt(y_rotation, tilt_x, tilt_z)
 
+    # No tilt: only the Y rotation is left (Rz = Rx = identity)
+    if not randomize_y:
+        return IDENTITY_ROTATION
+    sy, cy = _sincos(y_rotation)
+    return (cy, 0.0, sy,  0.0, 1.0, 0.0,  -sy, 0.0, cy)
 
 def generate_object_rotation(props):
     """
@@ -2106,115 +2840,178 @@ def generate_object_rotation(props):
     Implements the rotation logic from C# MapGenerator.
 
     Args:
-        props: Asset properties dict with 'randomize_y_rotation' and 'tilt_angle'
+        props: AssetProps record
 
     Returns:
         9-tuple rotation matrix
     """
-    y_rotation = None
-    tilt_x = 0.0
-    tilt_z = 0.0
-
-    # Random Y rotation (from WorldItemSettings.RandomizeYRotation)
-    if props.get("randomize_y_rotation", True):
-        y_rotation = random.uniform(0, math.tau)
-    else:
-        y_rotation = 0.0
-
-    # Random tilt (from WorldItemSettings.RandomizeTiltAngle)
-    max_tilt = props.get("tilt_angle", 0.0)
-    if max_tilt > 0:
-        tilt_x = math.radians(random.uniform(-max_tilt, max_tilt))
-        tilt_z = math.radians(random.uniform(-max_tilt, max_tilt))
-
-    return rotation_matrix_with_tilt(y_rotation, tilt_x, tilt_z)
+    return random_object_rotation(props.randomize_y_rotation, props.tilt_angle)
 
 def get_asset_props(role):
-    """Get properties for an asset role, falling back to defaults."""
-    # Start with defaults
-    props = dict(DEFAULT_ASSET_PROPS)
-
+    """Get the AssetProps record for an asset role, falling back to defaults."""
     # Try exact match first
-    if role in ASSET_PROPERTIES:
-        props.update(ASSET_PROPERTIES[role])
+    props = ASSET_PROPERTIES.get(role)
+    if props is not None:
         return props
 
     # Try base name (e.g., "tree_pine" from "tree_pine_1")
     base = "_".join(role.rsplit("_", 1)[:-1]) if role[-1].isdigit() else role
-    if base in ASSET_PROPERTIES:
-        props.update(ASSET_PROPERTIES[base])
-        return props
-
+    return ASSET_PROPERTIES.get(base, DEFAULT_ASSET_PROPS)
+
+
+def _props_tuple(props):
+    """Flatten an AssetProps record into the ASSET_PROPS_FAST field order."""
+    return (props.min_spacing, props.scale_lo, props.scale_hi, props.y_offset,
+            props.min_altitude, props.max_altitude,
+            props.randomize_y_rotation, props.tilt_angle)
+
+# Tuple view of the resolved props for the placement loops, unpacked as
+# (min_spacing, scale_lo, scale_hi, y_offset, min_alt, max_alt, randomize_y, tilt)
+_family_tuples = {props: _props_tuple(props) for props in set(ASSET_PROPERTIES.values())}
+ASSET_PROPS_FAST = {role: _family_tuples[props] for role, props in ASSET_PROPERTIES.items()}
+del _family_tuples
+
+def get_asset_props_fast(role):
+    """Tuple form of get_asset_props(role); unknown roles are resolved once and remembered."""
+    props = ASSET_PROPS_FAST.get(role)
+    if props is None:
+        props = ASSET_PROPS_FAST[role] = _props_tuple(get_asset_props(role))
     return props
 
-
-def check_altitude_constraint(height, props):
-    """
-    Check if a terrain height is within the asset's spawn altitude constraints.
-    Based on C# MapGenerator's MinimumSpawnAltitude/MaximumSpawnAltitude check.
-
-    Args:
-        height: Terrain height at spawn location
-        props: Asset properties dict
-
-    Returns:
-        True if height is within constraints, False otherwise
-    """
-    min_alt = props.get("min_altitude", -100.0)
-    max_alt = props.get("max_altitude", 100.0)
-    return min_alt <= height <= max_alt
-
 def distance_squared(x1, z1, x2, z2):
     """Calculate squared distance between two 2D points."""
     dx = x2 - x1
     dz = z2 - z1
     return dx * dx + dz * dz
 
-def check_collision(x, z, placed_positions, min_dist):
-    """Check if position collides with any existing placement."""
-    min_dist_sq = min_dist * min_dist
-    for px, pz, p_min_dist in placed_positions:
-        # Use the larger of the two minimum distances
-        check_dist_sq = max(min_dist, p_min_dist) ** 2
-        if distance_squared(x, z, px, pz) < check_dist_sq:
-            return True
-    return False
+class CollisionGrid:
+    """
+    Uniform spatial hash of placed (x, z, min_dist) footprints.
+
+    Two objects collide when closer than the larger of their min_dist values,
+    exactly as the old linear scan did, but a query only visits the cells
+    that can hold such a neighbour. With cell_size >= the largest spacing in
+    use that is the 3x3 block around the query point.
+    """
+    __slots__ = ("cell_size", "cells", "entries", "max_dist")
+
+    def __init__(self, cell_size):
+        self.cell_size = max(float(cell_size), 1e-6)
+        self.cells = {}
+        self.entries = []
+        self.max_dist = 0.0
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, x, z, min_dist):
+        """Register a placed footprint."""
+        entry = (x, z, min_dist)
+        self.entries.append(entry)
+        key = (math.floor(x / self.cell_size), math.floor(z / self.cell_size))
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [entry]
+        else:
+            bucket.append(entry)
+        if min_dist > self.max_dist:
+            self.max_dist = min_dist
+
+    def collides(self, x, z, min_dist):
+        """Check if position collides with any existing placement."""
+        reach = max(min_dist, self.max_dist)
+        span = max(1, math.ceil(reach / self.cell_size))
+        cx = math.floor(x / self.cell_size)
+        cz = math.floor(z / self.cell_size)
+        cells = self.cells
+        for ix in range(cx - span, cx + span + 1):
+            for iz in range(cz - span, cz + span + 1):
+                bucket = cells.get((ix, iz))
+                if bucket is None:
+                    continue
+                for px, pz, p_min_dist in bucket:
+                    # Use the larger of the two minimum distances
+                    check_dist_sq = max(min_dist, p_min_dist) ** 2
+                    if distance_squared(x, z, px, pz) < check_dist_sq:
+                        return True
+        return False
+
+    def any_within(self, x, z, dist):
+        """True if any placed footprint's centre is closer than dist to (x, z)."""
+        span = max(1, math.ceil(dist / self.cell_size))
+        cx = math.floor(x / self.cell_size)
+        cz = math.floor(z / self.cell_size)
+        cells = self.cells
+        dist_sq = dist * dist
+        for ix in range(cx - span, cx + span + 1):
+            for iz in range(cz - span, cz + span + 1):
+                bucket = cells.get((ix, iz))
+                if bucket is None:
+                    continue
+                for px, pz, _ in bucket:
+                    if (x - px) ** 2 + (z - pz) ** 2 < dist_sq:
+                        return True
+        return False
 
-def get_biome_at_distance(path_distance):
+def _biome_for_segment(segment):
+    """Biome of one path segment (deterministic random based on segment)."""
+    return random.Random(SEED + segment * 1000).choice(BIOME_NAMES)
+
+def build_biome_lut():
+    """
+    Precompute the biome of every BIOME_SEGMENT_LENGTH segment along the path,
+    so get_biome_at_distance is a list lookup instead of seeding a new Random.
+    """
+    num_segments = int(PATH_LENGTH / BIOME_SEGMENT_LENGTH) + 1
+    return [_biome_for_segment(segment) for segment in range(num_segments)]
+
+def get_biome_at_distance(path_distance, biome_lut=None):
     """Determine biome based on distance along path."""
     # If using realistic trees, always use the realistic biome
     if USE_REALISTIC_TREES:
         return "realistic"
     # Divide path into segments, each segment can be a different biome
     segment = int(path_distance / BIOME_SEGMENT_LENGTH)
-    # Use deterministic random based on segment
-    r = random.Random(SEED + segment * 1000)
-    return r.choice(list(BIOMES.keys()))
+    if biome_lut is not None and 0 <= segment < len(biome_lut):
+        return biome_lut[segment]
+    return _biome_for_segment(segment)
 
-def select_asset_for_biome(biome, available_roles):
+def build_biome_tables(available_roles):
+    """
+    Precompute weighted-choice tables for every biome.
+    Returns biome -> (roles, cumulative_weights, total_weight), restricted to
+    available_roles, so each draw is a binary search instead of a rebuild.
+    """
+    available = set(available_roles)
+    tables = {}
+    for biome, category_weights in BIOME_CATEGORY_WEIGHTS.items():
+        roles = []
+        cumulative = []
+        running = 0
+        for category, weight in category_weights:
+            for role in ASSET_CATEGORIES[category]:
+                if role in available:
+                    roles.append(role)
+                    running += weight
+                    cumulative.append(running)
+        tables[biome] = (roles, cumulative, running)
+    return tables
+
+def select_asset_for_biome(biome, available_roles, biome_tables=None):
     """Select an asset role based on biome weights."""
-    biome_weights = BIOMES.get(biome, BIOMES["forest"])
+    if biome_tables is None:
+        biome_tables = build_biome_tables(available_roles)
+    roles, cumulative, total = biome_tables.get(biome, biome_tables["forest"])
 
-    # Build weighted list of available assets
-    weighted = []
-    for category, weight in biome_weights.items():
-        if category in ASSET_CATEGORIES:
-            for role in ASSET_CATEGORIES[category]:
-                if role in available_roles:
-                    weighted.append((role, weight))
-
-    if not weighted:
-        return random.choice(list(available_roles))
-
-    # Weighted random selection
-    total = sum(w for _, w in weighted)
-    r = random.random() * total
-    cumulative = 0
-    for role, weight in weighted:
-        cumulative += weight
-        if r <= cumulative:
-            return role
-    return weighted[-1][0]
+    if not roles:
+        return RNG.choice(list(available_roles))
+
+    # Weighted random selection: first role whose cumulative weight reaches r
+    r = RNG.random() * total
+    return roles[min(bisect.bisect_left(cumulative, r), len(roles) - 1)]
 
 def generate_clearings(path_pts):
     """Generate circular clearing zones along the path.
@@ -2225,17 +3022,17 @@ def generate_clearings(path_pts):
     clearing_interval = max(1, len(path_pts) // 8)  # About 8 potential clearing spots
     for i in range(0, len(path_pts), clearing_interval):
         px, pz = path_pts[i]
-        if random.random() < CLEARING_CHANCE * 3:  # Higher chance per spot
+        if RNG.random() < CLEARING_CHANCE * 3:  # Higher chance per spot
             # Offset clearing slightly from path center
-            offset = random.uniform(0, CLEARING_RADIUS * 0.3)
-            angle = random.uniform(0, math.tau)
+            offset = RNG.uniform(0, CLEARING_RADIUS * 0.3)
+            angle = RNG.uniform(0, math.tau)
             cx = px + math.cos(angle) * offset
             cz = pz + math.sin(angle) * offset
-            radius = CLEARING_RADIUS * random.uniform(0.7, 1.0)
+            radius = CLEARING_RADIUS * RNG.uniform(0.7, 1.0)
             clearings.append((cx, cz, radius))
             # 60% of clearings become ponds
-            if random.random() < 0.6:
-                pond_radius = radius * random.uniform(0.4, 0.7)
+            if RNG.random() < 0.6:
+                pond_radius = radius * RNG.uniform(0.4, 0.7)
                 ponds.append((cx, cz, pond_radius))
     return clearings, ponds
 
@@ -2246,6 +3043,37 @@ def is_in_clearing(x, z, clearings):
             return True
     return False
 
+class ClearingIndex:
+    """
+    Spatial hash over clearing discs for is_in_clearing-style queries.
+
+    Each clearing is registered in every cell its bounding square touches, so
+    a query reads one cell and tests only the clearings that can contain the
+    point; away from clearings that is a single failed dict lookup.
+    """
+    __slots__ = ("cell_size", "cells")
+
+    def __init__(self, clearings):
+        self.cell_size = max((radius for _, _, radius in clearings), default=CLEARING_RADIUS)
+        self.cells = {}
+        size = self.cell_size
+        for cx, cz, radius in clearings:
+            zone = (cx, cz, radius * radius)
+            for ix in range(math.floor((cx - radius) / size), math.floor((cx + radius) / size) + 1):
+                for iz in range(math.floor((cz - radius) / size), math.floor((cz + radius) / size) + 1):
+                    self.cells.setdefault((ix, iz), []).append(zone)
+
+    def contains(self, x, z):
+        """Same answer as is_in_clearing(x, z, clearings)."""
+        size = self.cell_size
+        zones = self.cells.get((math.floor(x / size), math.floor(z / size)))
+        if zones is None:
+            return False
+        for cx, cz, radius_sq in zones:
+            if distance_squared(x, z, cx, cz) < radius_sq:
+                return True
+        return False
+
 def generate_secondary_paths(main_path_pts):
     """Generate branching secondary paths from the main path."""
     secondary_paths = []
@@ -2255,13 +3083,13 @@ def generate_secondary_paths(main_path_pts):
             continue
 
         # Pick a branch point somewhere along the main path (not too early or late)
-        branch_idx = random.randint(len(main_path_pts) // 4, 3 * len(main_path_pts) // 4)
+        branch_idx = RNG.randint(len(main_path_pts) // 4, 3 * len(main_path_pts) // 4)
         branch_x, branch_z = main_path_pts[branch_idx]
 
         # Get tangent at branch point and pick a perpendicular direction
         tang = tangent_at(main_path_pts, branch_idx)
         p = perp(tang)
-        side = random.choice([-1, 1])
+        side = RNG.choice([-1, 1])
 
         # Generate control points for secondary path
         sec_ctrl_pts = [(branch_x, branch_z)]
@@ -2271,7 +3099,7 @@ def generate_secondary_paths(main_path_pts):
         for i in range(1, num_points):
             last_x, last_z = sec_ctrl_pts[-1]
             # Curve away from main path
-            wander_x = random.uniform(-SECONDARY_PATH_WANDER, SECONDARY_PATH_WANDER)
+            wander_x = RNG.uniform(-SECONDARY_PATH_WANDER, SECONDARY_PATH_WANDER)
             wander_z = step
             # Apply perpendicular drift
             drift = (i / num_points) * side * SECONDARY_PATH_WANDER * 0.5
@@ -2283,65 +3111,136 @@ def generate_secondary_paths(main_path_pts):
 
     return secondary_paths
 
-def add_cluster_objects(placements, placed_positions, available_roles, x, z, parent_role, path_pts=None):
-    """Add small satellite objects around a placed object."""
-    if random.random() > CLUSTER_CHANCE:
+class Placements:
+    """
+    Placed object instances stored column-wise (struct of arrays).
+
+    Row i is described by roles[i], xs/ys/zs[i], scales[i] and the nine
+    row-major basis values rots[9*i:9*i+9]. Numeric columns are packed
+    doubles, so each instance costs 13 floats instead of a dict plus a tuple.
+    """
+    __slots__ = ("roles", "xs", "ys", "zs", "scales", "rots")
+
+    def __init__(self):
+        self.roles = []
+        self.xs = array.array("d")
+        self.ys = array.array("d")
+        self.zs = array.array("d")
+        self.scales = array.array("d")
+        self.rots = array.array("d")
+
+    def __len__(self):
+        return len(self.roles)
+
+    def add(self, role, x, y, z, scale, rot):
+        """Append one instance; rot is the 9-value basis from generate_object_rotation."""
+        self.roles.append(role)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.zs.append(z)
+        self.scales.append(scale)
+        self.rots.extend(rot)
+
+    def rot(self, i):
+        """Return the rotation basis of instance i."""
+        return self.rots[9 * i:9 * i + 9]
+
+# Role-name keywords that drive clustering, one bit each
+ROLE_KEYWORD_BITS = types.MappingProxyType({
+    "tree": 1, "rock_large": 2, "bush": 4, "fern": 8, "mushroom": 16,
+    "flower": 32, "grass": 64, "rock_small": 128, "moss": 256,
+})
+
+# (parent keyword bit, satellite keyword mask), first matching parent wins
+CLUSTER_RULES = (
+    # Small plants cluster around trees
+    (ROLE_KEYWORD_BITS["tree"],
+     ROLE_KEYWORD_BITS["fern"] | ROLE_KEYWORD_BITS["mushroom"]
+     | ROLE_KEYWORD_BITS["flower"] | ROLE_KEYWORD_BITS["grass"]),
+    # Small rocks cluster around large rocks
+    (ROLE_KEYWORD_BITS["rock_large"], ROLE_KEYWORD_BITS["rock_small"] | ROLE_KEYWORD_BITS["moss"]),
+    (ROLE_KEYWORD_BITS["bush"],
+     ROLE_KEYWORD_BITS["fern"] | ROLE_KEYWORD_BITS["flower"] | ROLE_KEYWORD_BITS["grass"]),
+)
+
+# Roles that can have satellites (any parent keyword)
+CLUSTER_PARENT_BITS = ROLE_KEYWORD_BITS["tree"] | ROLE_KEYWORD_BITS["rock_large"] | ROLE_KEYWORD_BITS["bush"]
+
+@functools.lru_cache(maxsize=None)
+def role_keyword_bits(role):
+    """Bitmask of the ROLE_KEYWORD_BITS keywords contained in a role name."""
+    bits = 0
+    for keyword, bit in ROLE_KEYWORD_BITS.items():
+        if keyword in role:
+            bits |= bit
+    return bits
+
+def cluster_mask(parent_role):
+    """Satellite keyword mask for a parent role (0 if nothing clusters around it)."""
+    bits = role_keyword_bits(parent_role)
+    for parent_bit, satellite_mask in CLUSTER_RULES:
+        if bits & parent_bit:
+            return satellite_mask
+    return 0
+
+def build_cluster_roles(available_roles):
+    """Satellite mask -> available roles matching it, for every CLUSTER_RULES entry."""
+    return {
+        mask: [r for r in available_roles if role_keyword_bits(r) & mask]
+        for _, mask in CLUSTER_RULES
+    }
+
+def add_cluster_objects(placements, placed_positions, available_roles, x, z, parent_role, path_pts=None,
+                        cluster_roles=None):
+    """
+    Add small satellite objects around a placed object.
+    cluster_roles is a build_cluster_roles table for available_roles; it is
+    built on the fly when not given.
+    """
+    if RNG.random() > CLUSTER_CHANCE:
         return
 
     # Determine what can cluster around this object
-    cluster_candidates = []
-    if "tree" in parent_role:
-        # Small plants cluster around trees
-        cluster_candidates = [r for r in available_roles if any(
-            cat in r for cat in ["fern", "mushroom", "flower", "grass"]
-        )]
-    elif "rock_large" in parent_role:
-        # Small rocks cluster around large rocks
-        cluster_candidates = [r for r in available_roles if "rock_small" in r or "moss" in r]
-    elif "bush" in parent_role:
-        cluster_candidates = [r for r in available_roles if any(
-            cat in r for cat in ["fern", "flower", "grass"]
-        )]
+    mask = cluster_mask(parent_role)
+    if not mask:
+        return
+    if cluster_roles is None:
+        cluster_roles = build_cluster_roles(available_roles)
+    cluster_candidates = cluster_roles[mask]
 
     if not cluster_candidates:
         return
 
     # Add 1-3 satellite objects
-    num_satellites = random.randint(1, 3)
+    num_satellites = RNG.randint(1, 3)
     for _ in range(num_satellites):
-        role = random.choice(cluster_candidates)
-        props = get_asset_props(role)
-        min_spacing = props["min_spacing"]
+        role = RNG.choice(cluster_candidates)
+        min_spacing, scale_min, scale_max, y_offset, min_alt, max_alt, randomize_y, max_tilt = get_asset_props_fast(role)
 
         # Position near parent
-        angle = random.uniform(0, math.tau)
-        dist = random.uniform(min_spacing, min_spacing * 2.5)
+        angle = RNG.uniform(0, math.tau)
+        dist = RNG.uniform(min_spacing, min_spacing * 2.5)
         sat_x = x + math.cos(angle) * dist
         sat_z = z + math.sin(angle) * dist
 
         # Check collision
-        if check_collision(sat_x, sat_z, placed_positions, min_spacing):
+        if placed_positions.collides(sat_x, sat_z, min_spacing):
             continue
 
-        scale_min, scale_max = props["scale_range"]
-        y_offset = props["y_offset"]
 
         # Calculate terrain height
         terrain_y = get_terrain_height(sat_x, sat_z, path_pts)
 
         # Check altitude constraint (from C# MapGenerator)
-        if not check_altitude_constraint(terrain_y, props):
+        if not (min_alt <= terrain_y <= max_alt):
             continue
 
-        placements.append({
-            "role": role,
-            "x": sat_x,
-            "y": terrain_y + y_offset,
-            "z": sat_z,
-            "scale": random.uniform(scale_min, scale_max),
-            "rot": generate_object_rotation(props),  # Use enhanced rotation
-        })
-        placed_positions.append((sat_x, sat_z, min_spacing))
+        placements.add(
+            role, sat_x, terrain_y + y_offset, sat_z,
+            RNG.uniform(scale_min, scale_max),
+            random_object_rotation(randomize_y, max_tilt),  # Use enhanced rotation
+        )
+        placed_positions.add(sat_x, sat_z, min_spacing)
 
 def generate_placements(path_pts, tscn_paths, secondary_paths=None):
     """
@@ -2357,16 +3256,22 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
     Returns (placements, ponds) where ponds are water features.
     """
     available = list(tscn_paths.keys())
-    placements = []
-    placed_positions = []  # (x, z, min_dist) for collision checking
+    placements = Placements()
+    biome_tables = build_biome_tables(available)
+    biome_lut = build_biome_lut()
+    # (x, z, min_dist) footprints for collision checking; cells sized to the widest spacing
+    placed_positions = CollisionGrid(max(
+        (get_asset_props_fast(r)[0] for r in available), default=MIN_OBJECT_SPACING))
     altitude_filtered = 0  # Counter for altitude-filtered objects
 
     # Separate tree roles for priority placement
-    tree_roles = [r for r in available if r in ASSET_CATEGORIES.get("trees", [])]
-    non_tree_available = [r for r in available if r not in tree_roles]
+    tree_roles = [r for r in available if ASSET_TO_CATEGORY.get(r) == "trees"]
+    non_tree_available = [r for r in available if ASSET_TO_CATEGORY.get(r) != "trees"]
+    cluster_roles = build_cluster_roles(available)
 
     # Generate clearings (some become ponds)
     clearings, ponds = generate_clearings(path_pts)
+    clearing_index = ClearingIndex(clearings)
 
     # Calculate placement area bounds (use TREE_SCATTER_OUTER for wider coverage)
     all_x = [p[0] for p in path_pts]
@@ -2376,6 +3281,9 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
     z_min = min(all_z) - TREE_SCATTER_OUTER
     z_max = max(all_z) + TREE_SCATTER_OUTER
 
+    # Sample the terrain noise once over the whole placement area
+    build_heightmap(x_min, x_max, z_min, z_max)
+
     # Use Poisson Disc Sampling if enabled (from C# PoissonDisc.cs)
     if USE_POISSON_SAMPLING:
         print(f"      Using Poisson Disc Sampling (radius={POISSON_RADIUS})...")
@@ -2388,105 +3296,84 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
         )
         print(f"      Generated {len(poisson_points)} Poisson disc sample points")
 
+        # The clearing and path-range tests draw no random numbers, so both
+        # passes share one filtered candidate list: (x, z, terrain_y, path
+        # distance, nearest path index), with terrain heights computed in one
+        # batch. Nearest-path lookups only visit grid cells in scatter range.
+        tree_path_index = get_path_index(path_pts, TREE_SCATTER_OUTER)
+        in_range = []
+        for x, z in poisson_points:
+            if clearing_index.contains(x, z):
+                continue
+            hit = tree_path_index.nearest(x, z, TREE_SCATTER_OUTER)
+            if hit is None:
+                continue
+            min_path_dist = math.sqrt(hit[0])
+            if min_path_dist < SCATTER_INNER:
+                continue
+            in_range.append((x, z, min_path_dist, hit[1]))
+        terrain_ys = get_terrain_heights([(c[0], c[1]) for c in in_range], path_pts)
+        candidates = [(x, z, terrain_y, min_path_dist, nearest_path_idx)
+                      for (x, z, min_path_dist, nearest_path_idx), terrain_y in zip(in_range, terrain_ys)]
+
         # PASS 1: Place trees first to ensure they get priority
         if tree_roles:
             tree_count = 0
-            for x, z in poisson_points:
-                if is_in_clearing(x, z, clearings):
-                    continue
-                # Check path distance
-                min_path_dist = float('inf')
-                nearest_path_idx = 0
-                for i, (px, pz) in enumerate(path_pts):
-                    d = math.sqrt(distance_squared(x, z, px, pz))
-                    if d < min_path_dist:
-                        min_path_dist = d
-                        nearest_path_idx = i
-                if min_path_dist > TREE_SCATTER_OUTER or min_path_dist < SCATTER_INNER:
-                    continue
+            for x, z, terrain_y, _, _ in candidates:
                 # Randomly decide to place a tree (50% chance per valid point for better coverage)
-                if random.random() > 0.50:
+                if RNG.random() > 0.50:
                     continue
-                role = random.choice(tree_roles)
-                props = get_asset_props(role)
-                min_spacing = props["min_spacing"]
-                if check_collision(x, z, placed_positions, min_spacing):
+                role = RNG.choice(tree_roles)
+                min_spacing, scale_min, scale_max, y_offset, min_alt, max_alt, randomize_y, max_tilt = get_asset_props_fast(role)
+                if placed_positions.collides(x, z, min_spacing):
                     continue
-                terrain_y = get_terrain_height(x, z, path_pts)
-                if not check_altitude_constraint(terrain_y, props):
+                if not (min_alt <= terrain_y <= max_alt):
                     continue
-                scale_min, scale_max = props["scale_range"]
-                placements.append({
-                    "role": role,
-                    "x": x,
-                    "y": terrain_y + props["y_offset"],
-                    "z": z,
-                    "scale": random.uniform(scale_min, scale_max),
-                    "rot": generate_object_rotation(props),
-                })
-                placed_positions.append((x, z, min_spacing))
+                placements.add(
+                    role, x, terrain_y + y_offset, z,
+                    RNG.uniform(scale_min, scale_max),
+                    random_object_rotation(randomize_y, max_tilt),
+                )
+                placed_positions.add(x, z, min_spacing)
                 tree_count += 1
             print(f"      Placed {tree_count} trees in priority pass")
 
         # PASS 2: Place other objects
-        for x, z in poisson_points:
-            # Skip if in clearing
-            if is_in_clearing(x, z, clearings):
-                continue
-
+        for x, z, terrain_y, min_path_dist, nearest_path_idx in candidates:
             # Skip if too far from any path
-            min_path_dist = float('inf')
-            nearest_path_idx = 0
-            for i, (px, pz) in enumerate(path_pts):
-                d = math.sqrt(distance_squared(x, z, px, pz))
-                if d < min_path_dist:
-                    min_path_dist = d
-                    nearest_path_idx = i
-
             if min_path_dist > SCATTER_OUTER:
                 continue
-            if min_path_dist < SCATTER_INNER:
-                continue
 
             # Calculate distance along path for biome selection
             path_distance = (nearest_path_idx / len(path_pts)) * PATH_LENGTH
 
             # Select asset based on biome
-            biome = get_biome_at_distance(path_distance)
-            role = select_asset_for_biome(biome, available)
+            biome = get_biome_at_distance(path_distance, biome_lut)
+            role = select_asset_for_biome(biome, available, biome_tables)
 
             # Get asset-specific properties
-            props = get_asset_props(role)
-            min_spacing = props["min_spacing"]
+            min_spacing, scale_min, scale_max, y_offset, min_alt, max_alt, randomize_y, max_tilt = get_asset_props_fast(role)
 
             # Check collision with already placed objects
-            if check_collision(x, z, placed_positions, min_spacing):
+            if placed_positions.collides(x, z, min_spacing):
                 continue
 
-            scale_min, scale_max = props["scale_range"]
-            y_offset = props["y_offset"]
-
-            # Calculate terrain height
-            terrain_y = get_terrain_height(x, z, path_pts)
-
             # Check altitude constraint (from C# MapGenerator)
-            if not check_altitude_constraint(terrain_y, props):
+            if not (min_alt <= terrain_y <= max_alt):
                 altitude_filtered += 1
                 continue
 
-            placements.append({
-                "role": role,
-                "x": x,
-                "y": terrain_y + y_offset,
-                "z": z,
-                "scale": random.uniform(scale_min, scale_max),
-                "rot": generate_object_rotation(props),  # Enhanced rotation with tilt
-            })
-            placed_positions.append((x, z, min_spacing))
+            placements.add(
+                role, x, terrain_y + y_offset, z,
+                RNG.uniform(scale_min, scale_max),
+                random_object_rotation(randomize_y, max_tilt),  # Enhanced rotation with tilt
+            )
+            placed_positions.add(x, z, min_spacing)
 
             # Add cluster objects around trees and large rocks
-            if any(cat in role for cat in ["tree", "rock_large", "bush"]):
-                add_cluster_objects(placements, placed_positions, available, x, z, role, path_pts)
+            if role_keyword_bits(role) & CLUSTER_PARENT_BITS:
+                add_cluster_objects(placements, placed_positions, available, x, z, role, path_pts,
+                                    cluster_roles)
 
     else:
         # Original path-following placement method
@@ -2507,56 +3394,51 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
                 path_distance = (seg / len(pts)) * PATH_LENGTH
 
                 for _ in range(objects_per_seg):
-                    idx = min(int(seg + random.random()), len(pts) - 1)
+                    idx = min(int(seg + RNG.random()), len(pts) - 1)
                     px, pz = pts[idx]
                     p = perp(tangent_at(pts, idx))
-                    side = random.choice([-1, 1])
-                    dist = random.uniform(SCATTER_INNER, scatter_outer)
+                    side = RNG.choice([-1, 1])
+                    dist = RNG.uniform(SCATTER_INNER, scatter_outer)
 
                     # Calculate candidate position
                     x = px + p[0] * side * dist
                     z = pz + p[1] * side * dist
 
                     # Skip if in clearing
-                    if is_in_clearing(x, z, clearings):
+                    if clearing_index.contains(x, z):
                         continue
 
                     # Select asset based on biome
-                    biome = get_biome_at_distance(path_distance)
-                    role = select_asset_for_biome(biome, available)
+                    biome = get_biome_at_distance(path_distance, biome_lut)
+                    role = select_asset_for_biome(biome, available, biome_tables)
 
                     # Get asset-specific properties
-                    props = get_asset_props(role)
-                    min_spacing = props["min_spacing"]
+                    min_spacing, scale_min, scale_max, y_offset, min_alt, max_alt, randomize_y, max_tilt = get_asset_props_fast(role)
 
                     # Check collision
-                    if check_collision(x, z, placed_positions, min_spacing):
+                    if placed_positions.collides(x, z, min_spacing):
                         continue
 
-                    scale_min, scale_max = props["scale_range"]
-                    y_offset = props["y_offset"]
 
                     # Calculate terrain height
                     terrain_y = get_terrain_height(x, z, path_pts)
 
                     # Check altitude constraint (from C# MapGenerator)
-                    if not check_altitude_constraint(terrain_y, props):
+                    if not (min_alt <= terrain_y <= max_alt):
                         altitude_filtered += 1
                         continue
 
-                    placements.append({
-                        "role": role,
-                        "x": x,
-                        "y": terrain_y + y_offset,
-                        "z": z,
-                        "scale": random.uniform(scale_min, scale_max),
-                        "rot": generate_object_rotation(props),  # Enhanced rotation with tilt
-                    })
-                    placed_positions.append((x, z, min_spacing))
+                    placements.add(
+                        role, x, terrain_y + y_offset, z,
+                        RNG.uniform(scale_min, scale_max),
+                        random_object_rotation(randomize_y, max_tilt),  # Enhanced rotation with tilt
+                    )
+                    placed_positions.add(x, z, min_spacing)
 
                     # Add cluster objects around trees and large rocks
-                    if any(cat in role for cat in ["tree", "rock_large", "bush"]):
-                        add_cluster_objects(placements, placed_positions, available, x, z, role, path_pts)
+                    if role_keyword_bits(role) & CLUSTER_PARENT_BITS:
+                        add_cluster_objects(placements, placed_positions, available, x, z, role, path_pts,
+                                            cluster_roles)
 
     if altitude_filtered > 0:
         print(f"      Filtered {altitude_filtered} objects by altitude constraints")
@@ -2577,40 +3459,36 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
                 seed=SEED + 1000  # Different seed for grass
             )
 
+            # The clearing and spacing tests draw no random numbers and grass
+            # never joins placed_positions, so candidates are filtered up front
+            # and their terrain heights computed in one batch
+            candidates = []
             for jx, jz in grass_points:
                 # Skip if in clearing
-                if is_in_clearing(jx, jz, clearings):
+                if clearing_index.contains(jx, jz):
                     continue
 
                 # Skip if too close to existing objects (trees, rocks)
-                too_close = False
-                for px, pz, min_d in placed_positions:
-                    if (jx - px) ** 2 + (jz - pz) ** 2 < 1.0:
-                        too_close = True
-                        break
-
-                if not too_close:
-                    grass_role = random.choice(grass_roles)
-                    props = get_asset_props(grass_role)
-                    scale_min, scale_max = props["scale_range"]
-
-                    # Calculate terrain height for grass
-                    terrain_y = get_terrain_height(jx, jz, path_pts)
-
-                    # Check altitude constraint
-                    if not check_altitude_constraint(terrain_y, props):
-                        grass_altitude_filtered += 1
-                        continue
+                if not placed_positions.any_within(jx, jz, 1.0):
+                    candidates.append((jx, jz))
+
+            terrain_ys = get_terrain_heights(candidates, path_pts)
+
+            for (jx, jz), terrain_y in zip(candidates, terrain_ys):
+                grass_role = RNG.choice(grass_roles)
+                min_spacing, scale_min, scale_max, y_offset, min_alt, max_alt, randomize_y, max_tilt = get_asset_props_fast(grass_role)
+
+                # Check altitude constraint
+                if not (min_alt <= terrain_y <= max_alt):
+                    grass_altitude_filtered += 1
+                    continue
 
-                    placements.append({
-                        "role": grass_role,
-                        "x": jx,
-                        "y": terrain_y + props["y_offset"],
-                        "z": jz,
-                        "scale": random.uniform(scale_min, scale_max),
-                        "rot": generate_object_rotation(props),  # Enhanced rotation with tilt
-                    })
-                    grass_count += 1
+                placements.add(
+                    grass_role, jx, terrain_y + y_offset, jz,
+                    RNG.uniform(scale_min, scale_max),
+                    random_object_rotation(randomize_y, max_tilt),  # Enhanced rotation with tilt
+                )
+                grass_count += 1
         else:
             # Original grid-based grass placement
             grass_spacing = 4.0  # Increased for faster loading
@@ -2624,39 +3502,29 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
             while x < area_size / 2:
                 z = z_start
                 while z < z_end:
-                    jx = x + random.uniform(-grass_spacing * 0.4, grass_spacing * 0.4)
-                    jz = z + random.uniform(-grass_spacing * 0.4, grass_spacing * 0.4)
+                    jx = x + RNG.uniform(-grass_spacing * 0.4, grass_spacing * 0.4)
+                    jz = z + RNG.uniform(-grass_spacing * 0.4, grass_spacing * 0.4)
 
-                    if is_in_clearing(jx, jz, clearings):
+                    if clearing_index.contains(jx, jz):
                         z += grass_spacing
                         continue
 
-                    too_close = False
-                    for px, pz, min_d in placed_positions:
-                        if (jx - px) ** 2 + (jz - pz) ** 2 < 1.0:
-                            too_close = True
-                            break
-
-                    if not too_close:
-                        grass_role = random.choice(grass_roles)
-                        props = get_asset_props(grass_role)
-                        scale_min, scale_max = props["scale_range"]
+                    if not placed_positions.any_within(jx, jz, 1.0):
+                        grass_role = RNG.choice(grass_roles)
+                        min_spacing, scale_min, scale_max, y_offset, min_alt, max_alt, randomize_y, max_tilt = get_asset_props_fast(grass_role)
 
                         terrain_y = get_terrain_height(jx, jz, path_pts)
 
-                        if not check_altitude_constraint(terrain_y, props):
+                        if not (min_alt <= terrain_y <= max_alt):
                             grass_altitude_filtered += 1
                             z += grass_spacing
                             continue
 
-                        placements.append({
-                            "role": grass_role,
-                            "x": jx,
-                            "y": terrain_y + props["y_offset"],
-                            "z": jz,
-                            "scale": random.uniform(scale_min, scale_max),
-                            "rot": generate_object_rotation(props),
-                        })
+                        placements.add(
+                            grass_role, jx, terrain_y + y_offset, jz,
+                            RNG.uniform(scale_min, scale_max),
+                            random_object_rotation(randomize_y, max_tilt),
+                        )
                         grass_count += 1
 
                     z += grass_spacing
@@ -2672,20 +3540,66 @@ def generate_placements(path_pts, tscn_paths, secondary_paths=None):
 # STEP 5 - WRITE THE FINAL MAP .TSCN
 # -------------------------
 
-def make_transform(rot, scale, x, y, z):
-    b = [v*scale for v in rot]
-    return (f"Transform3D({b[0]:.4f},{b[1]:.4f},{b[2]:.4f}," 
-            f"{b[3]:.4f},{b[4]:.4f},{b[5]:.4f}," 
-            f"{b[6]:.4f},{b[7]:.4f},{b[8]:.4f}," 
-            f"{x:.4f},{y:.4f},{z:.4f}")
+# Scaled 3x3 basis (row-major) followed by the origin, 4 decimals each
+TRANSFORM3D_TEMPLATE = "Transform3D(" + ",".join(["%.4f"] * 12) + ")"
+
+# One placed instance: node header plus its scaled basis and origin, filled with %.
+# The trailing newline stands in for the blank separator line between nodes.
+INSTANCE_NODE_TEMPLATE = (
+    '[node name="%d" parent="%s" instance=ExtResource("%s")]\n'
+    'transform = ' + TRANSFORM3D_TEMPLATE + '\n'
+)
+
+# Water pond node: index, x/z radius, origin and water mesh sub_resource id
+POND_NODE_TEMPLATE = (
+    '[node name="Pond_%d" type="MeshInstance3D" parent="."]\n'
+    'transform = Transform3D(%s, 0, 0, 0, 1, 0, 0, 0, %s, %.2f, %.2f, %.2f)\n'
+    'mesh = SubResource("%s")\n'
+)
+
+# Player instance at the start of the path
+PLAYER_NODE_TEMPLATE = (
+    '[node name="Player" parent="." instance=ExtResource("player_scene")]\n'
+    'transform = Transform3D(1, 0, 0, 0, 1, 0, 0, 0, 1, %.2f, %.2f, %.2f)\n'
+)
+
+EXT_RESOURCE_TEMPLATE = '[ext_resource type="%s" uid="%s" path="%s" id="%s"]'
+
+# Fixed ext_resources every map references, as (type, uid key, path, id)
+STATIC_EXT_RESOURCES = (
+    # Terrain, grass and water shaders
+    ("Shader", "terrain_pbr_shader", "res://shaders/terrain_pbr.gdshader", "terrain_pbr_shader"),
+    ("Shader", "grass_shader", "res://shaders/grass.gdshader", "grass_shader"),
+    ("Shader", "water_shader", "res://shaders/water.gdshader", "water_shader"),
+    # PBR textures - grass, dirt, rock, snow
+    *(("Texture2D", f"{surface}_{channel}", f"res://textures/{surface}_{channel}.png", f"{surface}_{channel}")
+      for surface in ("grass", "dirt", "rock", "snow")
+      for channel in ("albedo", "normal", "roughness")),
+    # Heightmap, noise and sky textures
+    *(("Texture2D", name, f"res://textures/{name}.png", name)
+      for name in ("heightmap", "wind_noise", "detail_noise", "grass_blade", "sky_panorama")),
+    # Mountain mesh and textures
+    ("ArrayMesh", "mountain_obj", "res://assets/nature/mountain.obj", "mountain_mesh"),
+    ("Texture2D", "mountain_color", "res://assets/nature/mountain_color.png", "mountain_color"),
+    ("Texture2D", "mountain_normal", "res://assets/nature/mountain_normal.png", "mountain_normal"),
+    # Collectible script and UI scene
+    ("Script", "collectible_script", "res://scripts/collectible.gd", "collectible_script"),
+    ("PackedScene", "ui_scene", "res://ui.tscn", "ui_scene"),
+)
+
+# Their [ext_resource] lines, formatted once at import
+STATIC_EXT_RESOURCE_LINES = tuple(
+    EXT_RESOURCE_TEMPLATE % (res_type, _make_uid(stable_hash(key)), path, res_id)
+    for res_type, key, path, res_id in STATIC_EXT_RESOURCES
+)
 
 def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None, path_data=None, secondary_paths=None, ponds=None):
     """Write the complete scene file with environment and all placements."""
-    used_roles = sorted(set(p["role"] for p in placements))
+    used_roles = sorted(set(placements.roles))
     resources = {r: tscn_paths[r] for r in used_roles if r in tscn_paths}
 
     # Generate environment resources
-    env_res_lines, env_res_ids = write_environment_resources()
+    env_res_text, env_res_ids = write_environment_resources()
 
     # Generate path curve resources
     path_curve_lines = []
@@ -2714,80 +3628,25 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
 
     lines = [f'[gd_scene load_steps={load_steps} format=3 uid="{scene_uid}"]', ""]
 
-    # Terrain PBR shader resource
-    shader_uid = _make_uid(hash("terrain_pbr_shader"))
-    lines.append(f'[ext_resource type="Shader" uid="{shader_uid}" path="res://shaders/terrain_pbr.gdshader" id="terrain_pbr_shader"]')
-
-    # Grass shader resource
-    grass_shader_uid = _make_uid(hash("grass_shader"))
-    lines.append(f'[ext_resource type="Shader" uid="{grass_shader_uid}" path="res://shaders/grass.gdshader" id="grass_shader"]')
-
-    # Water shader resource
-    water_shader_uid = _make_uid(hash("water_shader"))
-    lines.append(f'[ext_resource type="Shader" uid="{water_shader_uid}" path="res://shaders/water.gdshader" id="water_shader"]')
-
-    # PBR Textures - Grass
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("grass_albedo"))}" path="res://textures/grass_albedo.png" id="grass_albedo"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("grass_normal"))}" path="res://textures/grass_normal.png" id="grass_normal"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("grass_roughness"))}" path="res://textures/grass_roughness.png" id="grass_roughness"]')
-
-    # PBR Textures - Dirt
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("dirt_albedo"))}" path="res://textures/dirt_albedo.png" id="dirt_albedo"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("dirt_normal"))}" path="res://textures/dirt_normal.png" id="dirt_normal"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("dirt_roughness"))}" path="res://textures/dirt_roughness.png" id="dirt_roughness"]')
-
-    # PBR Textures - Rock
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("rock_albedo"))}" path="res://textures/rock_albedo.png" id="rock_albedo"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("rock_normal"))}" path="res://textures/rock_normal.png" id="rock_normal"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("rock_roughness"))}" path="res://textures/rock_roughness.png" id="rock_roughness"]')
-
-    # PBR Textures - Snow
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("snow_albedo"))}" path="res://textures/snow_albedo.png" id="snow_albedo"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("snow_normal"))}" path="res://textures/snow_normal.png" id="snow_normal"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("snow_roughness"))}" path="res://textures/snow_roughness.png" id="snow_roughness"]')
-
-    # Heightmap and noise textures
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("heightmap"))}" path="res://textures/heightmap.png" id="heightmap"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("wind_noise"))}" path="res://textures/wind_noise.png" id="wind_noise"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("detail_noise"))}" path="res://textures/detail_noise.png" id="detail_noise"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("grass_blade"))}" path="res://textures/grass_blade.png" id="grass_blade"]')
-
-    # Sky panorama texture
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("sky_panorama"))}" path="res://textures/sky_panorama.png" id="sky_panorama"]')
-
-    # Mountain mesh and textures
-    mountain_uid = _make_uid(hash("mountain_obj"))
-    lines.append(f'[ext_resource type="ArrayMesh" uid="{mountain_uid}" path="res://assets/nature/mountain.obj" id="mountain_mesh"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("mountain_color"))}" path="res://assets/nature/mountain_color.png" id="mountain_color"]')
-    lines.append(f'[ext_resource type="Texture2D" uid="{_make_uid(hash("mountain_normal"))}" path="res://assets/nature/mountain_normal.png" id="mountain_normal"]')
-
-    # Collectible script
-    collectible_uid = _make_uid(hash("collectible_script"))
-    lines.append(f'[ext_resource type="Script" uid="{collectible_uid}" path="res://scripts/collectible.gd" id="collectible_script"]')
-
-    # UI scene
-    ui_uid = _make_uid(hash("ui_scene"))
-    lines.append(f'[ext_resource type="PackedScene" uid="{ui_uid}" path="res://ui.tscn" id="ui_scene"]')
+    # Shaders, textures, mountain, collectible script and UI scene
+    lines.extend(STATIC_EXT_RESOURCE_LINES)
 
     # Player scene resource
     if player_scene_path:
-        player_uid = _make_uid(hash("player_instance"))
-        lines.append(f'[ext_resource type="PackedScene" uid="{player_uid}" path="{player_scene_path}" id="player_scene"]')
+        lines.append(EXT_RESOURCE_TEMPLATE % (
+            "PackedScene", _make_uid(stable_hash("player_instance")), player_scene_path, "player_scene"))
 
     # External resources (packed scenes for nature assets)
     res_ids = {}
     for i, (role, path) in enumerate(resources.items(), 1):
         rid = f"{i}_{role}"
         res_ids[role] = rid
-        ruid = _make_uid(hash(path))
-        lines.append(
-            f'[ext_resource type="PackedScene" uid="{ruid}" path="{path}" id="{rid}"]'
-        )
+        lines.append(EXT_RESOURCE_TEMPLATE % ("PackedScene", _make_uid(stable_hash(path)), path, rid))
 
     lines.append("")
 
     # Sub resources (environment materials, meshes, sky)
-    lines.extend(env_res_lines)
+    lines.append(env_res_text)
 
     # Path curve resources
     lines.extend(path_curve_lines)
@@ -2830,21 +3689,10 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
         lines.append("")
 
     # Sun (DirectionalLight3D) - REALISTIC daylight with high-quality shadows
-    gfx = get_graphics_settings()
-    sun_angle_x = -50.0   # Mid-day sun angle
-    sun_angle_y = -30.0
     sun_energy = 2.0      # Bright daylight
 
-    rot_x_rad = math.radians(sun_angle_x)
-    rot_y_rad = math.radians(sun_angle_y)
-    cx, sx = math.cos(rot_x_rad), math.sin(rot_x_rad)
-    cy, sy = math.cos(rot_y_rad), math.sin(rot_y_rad)
-    m00, m01, m02 = cy, sx * sy, -cx * sy
-    m10, m11, m12 = 0, cx, sx
-    m20, m21, m22 = sy, -sx * cy, cx * cy
-
     lines.append('[node name="Sun" type="DirectionalLight3D" parent="."]')
-    lines.append(f'transform = Transform3D({m00:.4f}, {m01:.4f}, {m02:.4f}, {m10:.4f}, {m11:.4f}, {m12:.4f}, {m20:.4f}, {m21:.4f}, {m22:.4f}, 0, 50, 0)')
+    lines.append(MAP_SUN_TRANSFORM_LINE)  # Mid-day sun angle
     lines.append('light_color = Color(1.0, 0.95, 0.9, 1)')   # Warm white sunlight
     lines.append(f'light_energy = {sun_energy}')
     lines.append('light_indirect_energy = 1.0')
@@ -2853,32 +3701,7 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
     lines.append('sky_mode = 0')  # LIGHT_ONLY - using PanoramaSkyMaterial
 
     # Shadow settings based on graphics quality
-    if gfx.get("shadow_enabled", True):
-        lines.append('shadow_enabled = true')
-        lines.append(f'shadow_bias = {gfx.get("shadow_bias", 0.02)}')
-        lines.append(f'shadow_normal_bias = {gfx.get("shadow_normal_bias", 1.0)}')
-        if "shadow_blur" in gfx:
-            lines.append(f'shadow_blur = {gfx.get("shadow_blur", 1.0)}')
-        if "shadow_transmittance_bias" in gfx:
-            lines.append(f'shadow_transmittance_bias = {gfx.get("shadow_transmittance_bias", 0.05)}')
-
-        # Directional shadow settings (PSSM)
-        shadow_mode = gfx.get("directional_shadow_mode", 2)  # 0=Orthogonal, 1=PSSM 2 Splits, 2=PSSM 4 Splits
-        lines.append(f'directional_shadow_mode = {shadow_mode}')
-
-        if shadow_mode >= 1:  # PSSM modes
-            if "directional_shadow_split_1" in gfx:
-                lines.append(f'directional_shadow_split_1 = {gfx.get("directional_shadow_split_1", 0.1)}')
-            if "directional_shadow_split_2" in gfx:
-                lines.append(f'directional_shadow_split_2 = {gfx.get("directional_shadow_split_2", 0.2)}')
-            if shadow_mode == 2 and "directional_shadow_split_3" in gfx:
-                lines.append(f'directional_shadow_split_3 = {gfx.get("directional_shadow_split_3", 0.5)}')
-            if gfx.get("directional_shadow_blend_splits", True):
-                lines.append('directional_shadow_blend_splits = true')
-
-        lines.append(f'directional_shadow_max_distance = {gfx.get("directional_shadow_max_distance", 200.0)}')
-        if "directional_shadow_fade_start" in gfx:
-            lines.append(f'directional_shadow_fade_start = {gfx.get("directional_shadow_fade_start", 0.8)}')
+    lines.extend(sun_shadow_lines(GRAPHICS_QUALITY.lower()))
     lines.append("")
 
     # WorldEnvironment
@@ -2886,8 +3709,6 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
     lines.append(f'environment = SubResource("{env_res_ids["environment"]}")')
     lines.append("")
 
-    features = preset.get("features", {})
-
     # Distant Mountain - place mountain model in background
     # Model is large (~500 units) so scale down and position appropriately
     lines.append('[node name="Mountain" type="MeshInstance3D" parent="."]')
@@ -2899,7 +3720,7 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
     print("      Added mountain backdrop")
 
     # Particle effects - falling leaves (if enabled in preset)
-    if features.get("particles", True) and "leaf_particle_material" in env_res_ids:
+    if FEATURE_PARTICLES and "leaf_particle_material" in env_res_ids:
         lines.append('[node name="FallingLeaves" type="GPUParticles3D" parent="."]')
         lines.append(f'transform = Transform3D(1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 25, {PATH_LENGTH / 2:.1f})')
         lines.append('amount = 80')
@@ -2910,7 +3731,7 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
         lines.append("")
 
     # Particle effects - floating dust motes (if enabled in preset)
-    if features.get("particles", True) and "dust_particle_material" in env_res_ids:
+    if FEATURE_PARTICLES and "dust_particle_material" in env_res_ids:
         lines.append('[node name="DustMotes" type="GPUParticles3D" parent="."]')
         lines.append(f'transform = Transform3D(1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 3, {PATH_LENGTH / 2:.1f})')
         lines.append('amount = 100')
@@ -2925,16 +3746,14 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
         lines.extend(write_path_nodes(path_data, secondary_paths, env_res_ids))
 
     # Water ponds (if enabled in preset)
-    if features.get("water_ponds", True) and ponds and "water_mesh" in env_res_ids:
+    if FEATURE_WATER_PONDS and ponds and "water_mesh" in env_res_ids:
+        water_mesh_id = env_res_ids["water_mesh"]
         for i, (px, pz, radius) in enumerate(ponds):
-            lines.append(f'[node name="Pond_{i}" type="MeshInstance3D" parent="."]')
             # Position pond at terrain height - ponds sit in clearings which are flattened
             # Use the actual terrain height at pond center, add small offset to avoid z-fighting
             pond_terrain_y = get_terrain_height(px, pz, path_data) if path_data else 0.0
             pond_y = pond_terrain_y + 0.05  # Slightly above terrain
-            lines.append(f'transform = Transform3D({radius}, 0, 0, 0, 1, 0, 0, 0, {radius}, {px:.2f}, {pond_y:.2f}, {pz:.2f})')
-            lines.append(f'mesh = SubResource("{env_res_ids["water_mesh"]}")')
-            lines.append("")
+            lines.append(POND_NODE_TEMPLATE % (i, radius, radius, px, pond_y, pz, water_mesh_id))
 
     # Player - positioned at start of path with terrain height
     player_x, player_z = 0, -5
@@ -2944,9 +3763,7 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
     player_y = player_terrain_y + 2.0  # Slightly above terrain
 
     if player_scene_path:
-        lines.append('[node name="Player" parent="." instance=ExtResource("player_scene")]')
-        lines.append(f'transform = Transform3D(1, 0, 0, 0, 1, 0, 0, 0, 1, {player_x:.2f}, {player_y:.2f}, {player_z:.2f})')
-        lines.append("")
+        lines.append(PLAYER_NODE_TEMPLATE % (player_x, player_y, player_z))
     else:
         # Fallback static camera if no player
         camera_y = player_terrain_y + 8.0
@@ -2963,34 +3780,40 @@ def write_map_scene(placements, tscn_paths, output_path, player_scene_path=None,
     # Nature object placements - grouped by type for organization
     from collections import defaultdict
     placements_by_role = defaultdict(list)
-    for p in placements:
-        if p["role"] in res_ids:
-            placements_by_role[p["role"]].append(p)
+    for idx, role in enumerate(placements.roles):
+        if role in res_ids:
+            placements_by_role[role].append(idx)
 
+    xs, ys, zs, scales = placements.xs, placements.ys, placements.zs, placements.scales
+    rots = placements.rots
     # Create parent nodes for each role type, then instances underneath
-    for role, role_placements in placements_by_role.items():
-        if not role_placements:
+    for role, role_indices in placements_by_role.items():
+        if not role_indices:
             continue
 
         # Parent node for this asset type
         lines.append(f'[node name="{role}" type="Node3D" parent="."]')
         lines.append("")
 
-        # Child instances with compact naming
-        for i, p in enumerate(role_placements):
-            tf = make_transform(p["rot"], p["scale"], p["x"], p["y"], p["z"])
-            lines.append(f'[node name="{i}" parent="{role}" instance=ExtResource("{res_ids[role]}")]')
-            lines.append(f'transform = {tf})')
-            lines.append("")
+        # Child instances with compact naming - one template fill per instance
+        ext_id = res_ids[role]
+        for i, idx in enumerate(role_indices):
+            scale = scales[idx]
+            r = 9 * idx
+            lines.append(INSTANCE_NODE_TEMPLATE % (
+                i, role, ext_id,
+                rots[r] * scale, rots[r + 1] * scale, rots[r + 2] * scale,
+                rots[r + 3] * scale, rots[r + 4] * scale, rots[r + 5] * scale,
+                rots[r + 6] * scale, rots[r + 7] * scale, rots[r + 8] * scale,
+                xs[idx], ys[idx], zs[idx],
+            ))
 
     print(f"      Created {len(placements)} object instances in {len(placements_by_role)} groups")
 
     # Write to file
-    with open(output_path, "w") as f:
-        f.write("\n".join(lines))
+    write_scene_lines(output_path, lines)
     print(f"  Wrote scene: {output_path}")
 
-
 # -------------------------
 # MAIN EXECUTION
 # -------------------------
@@ -3000,7 +3823,7 @@ if __name__ == "__main__":
     print("Godot Natural Outdoor Map Generator")
     print("=" * 50)
 
-    random.seed(SEED)
+    RNG.seed(SEED)
     clear_terrain_cache()
 
     # Step 1: Find KayKit zip
@@ -3018,24 +3841,26 @@ if __name__ == "__main__":
     assets_dir = os.path.join(project_dir, ASSETS_SUBDIR)
     setup_godot_project(project_dir)
 
-    print("\n[Step 2b] Extracting assets (skipping existing)...")
-    model_map = list_model_files_in_zip(zip_path)
-    resolved = extract_assets(zip_path, model_map, KAYKIT_ASSET_ROLES, assets_dir)
+    # The zip's central directory is parsed once and shared by every step below
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        print("\n[Step 2b] Extracting assets (skipping existing)...")
+        model_map = list_model_files_in_zip(zf)
+        resolved = extract_assets(zf, model_map, KAYKIT_ASSET_ROLES, assets_dir)
 
-    # Extract textures
-    print("\n[Step 2c] Extracting textures...")
-    extract_textures(zip_path, assets_dir)
+        # Extract textures
+        print("\n[Step 2c] Extracting textures...")
+        extract_textures(zf, assets_dir)
 
-    # Skip realistic assets (slow to import) - using KayKit only for faster loading
-    print("\n[Step 2d] Skipping realistic assets (disabled for faster import)...")
-    realistic_resolved = {}
+        # Skip realistic assets (slow to import) - using KayKit only for faster loading
+        print("\n[Step 2d] Skipping realistic assets (disabled for faster import)...")
+        realistic_resolved = {}
 
-    # Fuzzy match missing roles
-    missing = set(KAYKIT_ASSET_ROLES.keys()) - set(resolved.keys())
-    if missing:
-        print(f"\n[Step 2e] Fuzzy matching {len(missing)} missing roles...")
-        fuzzy_resolved = fuzzy_resolve_assets(zip_path, model_map, missing, KAYKIT_ASSET_ROLES, assets_dir)
-        resolved.update(fuzzy_resolved)
+        # Fuzzy match missing roles
+        missing = set(KAYKIT_ASSET_ROLES.keys()) - set(resolved.keys())
+        if missing:
+            print(f"\n[Step 2e] Fuzzy matching {len(missing)} missing roles...")
+            fuzzy_resolved = fuzzy_resolve_assets(zf, model_map, missing, KAYKIT_ASSET_ROLES, assets_dir)
+            resolved.update(fuzzy_resolved)
 
     print(f"\n  Total resolved roles: {len(resolved)}")
 
@@ -3056,14 +3881,10 @@ if __name__ == "__main__":
         print("\n[Step 3a] Loading new tree models...")
         new_trees_dir = os.path.join(project_dir, NEW_TREES_SUBDIR)
         if os.path.exists(new_trees_dir):
-            for role, candidates in NEW_TREE_ROLES.items():
-                for candidate in candidates:
-                    model_path = os.path.join(new_trees_dir, candidate)
-                    if os.path.exists(model_path):
-                        scene_name = candidate.replace(".obj", ".tscn").replace(".fbx", ".tscn")
-                        tscn_paths[role] = f"res://{NEW_TREES_SUBDIR}/{scene_name}"
-                        print(f"  Loaded [{role}] <- {candidate}")
-                        break
+            for role, (filename, subdir) in find_role_files(new_trees_dir, NEW_TREE_ROLES).items():
+                scene_name = filename.replace(".obj", ".tscn").replace(".fbx", ".tscn")
+                tscn_paths[role] = f"res://{subdir}/{scene_name}"
+                print(f"  Loaded [{role}] <- {filename}")
         else:
             print(f"  New trees folder not found: {new_trees_dir}")
 
@@ -3072,14 +3893,10 @@ if __name__ == "__main__":
         print("\n[Step 3b] Loading high-quality tree models...")
         trees_hq_dir = os.path.join(project_dir, TREES_HQ_SUBDIR)
         if os.path.exists(trees_hq_dir):
-            for role, candidates in TREES_HQ_ROLES.items():
-                for candidate in candidates:
-                    model_path = os.path.join(trees_hq_dir, candidate)
-                    if os.path.exists(model_path):
-                        # GLB files are loaded directly as scenes in Godot
-                        tscn_paths[role] = f"res://{TREES_HQ_SUBDIR}/{candidate}"
-                        print(f"  Loaded [{role}] <- {candidate}")
-                        break
+            for role, (filename, subdir) in find_role_files(trees_hq_dir, TREES_HQ_ROLES).items():
+                # GLB files are loaded directly as scenes in Godot
+                tscn_paths[role] = f"res://{subdir}/{filename}"
+                print(f"  Loaded [{role}] <- {filename}")
         else:
             print(f"  HQ trees folder not found: {trees_hq_dir}")
 